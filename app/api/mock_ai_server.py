@@ -1,8 +1,10 @@
 # Mock AI Server for testing ai-gateway
 # Usage: python mock_ai_server.py
 
+import asyncio
 import json
 import logging
+from typing import List
 from fastapi import FastAPI, File, UploadFile, Form
 from fastapi.responses import StreamingResponse
 import uvicorn
@@ -99,6 +101,91 @@ async def analyze(
     
     return StreamingResponse(generate(), media_type="application/x-ndjson")
 
+@app.post("/analyze/batch")
+async def analyze_batch(
+    files: List[UploadFile] = File(...),
+    taskIds: str = Form(...),
+    analysisRequests: str = Form(...)
+):
+    """
+    Mock AI 배치 분석 엔드포인트
+    files / taskIds / analysisRequests는 같은 순서, 결과 라인은 taskId로 구분 (작업별 결과가 섞여서 도착)
+    """
+    task_ids = json.loads(taskIds)
+    requests = json.loads(analysisRequests)
+    logger.info(f"배치 분석 요청: {len(files)}건, taskIds={task_ids}")
+    
+    # 작업별 /analyze 스트림을 돌아가며 한 줄씩 전송 (배치 추론 결과가 섞여서 나오는 상황 재현)
+    streams = []
+    for file, task_id, request in zip(files, task_ids, requests):
+        response = await analyze(file=file, taskId=task_id, analysisRequest=json.dumps(request))
+        streams.append(response.body_iterator)
+    
+    async def generate():
+        """스트리밍 응답 생성"""
+        pending = list(streams)
+        while pending:
+            for stream in list(pending):
+                try:
+                    yield await stream.__anext__()
+                except StopAsyncIteration:
+                    pending.remove(stream)
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.post("/conversation")
+async def conversation(
+    file: UploadFile = File(...),
+    taskId: str = Form(...),
+    analysisRequest: str = Form(...),
+    stream: str = Form("false")
+):
+    """
+    Mock AI 대화 엔드포인트
+    stream=true면 스트리밍 응답 (NDJSON 형식: transcript -> token -> final)
+    """
+    logger.info(f"대화 요청: taskId={taskId}, file={file.filename}, stream={stream}")
+    
+    transcript = "Hello, I would like to order a coffee."
+    reply = "Sure! What size would you like for your coffee?"
+    result = {
+        "taskId": taskId,
+        "status": "SUCCESS",
+        "error": None,
+        "analysisResult": {
+            "transcript": transcript,
+            "reply": reply
+        }
+    }
+    
+    if stream.lower() != "true":
+        return result
+    
+    async def generate():
+        """스트리밍 응답 생성"""
+        
+        # 1. 부분 전사 결과 (단어가 늘어날 때마다 전체 문장 전송)
+        words = transcript.split(" ")
+        for i in range(1, len(words) + 1):
+            chunk = {"event": "transcript", "taskId": taskId, "text": " ".join(words[:i]), "isFinal": i == len(words)}
+            yield json.dumps(chunk, ensure_ascii=False) + "\n"
+            await asyncio.sleep(0.05)
+        logger.info(f"Sent transcript for {taskId}")
+        
+        # 2. 응답 토큰
+        for i, token in enumerate(reply.split(" ")):
+            chunk = {"event": "token", "taskId": taskId, "delta": token if i == 0 else " " + token}
+            yield json.dumps(chunk, ensure_ascii=False) + "\n"
+            await asyncio.sleep(0.05)
+        logger.info(f"Sent reply tokens for {taskId}")
+        
+        # 3. 최종 결과 (비스트리밍 응답과 같은 형식)
+        yield json.dumps({"event": "final", **result}, ensure_ascii=False) + "\n"
+        logger.info(f"Sent final result for {taskId}")
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 
 if __name__ == "__main__":
     logger.info("Starting Mock AI Server on http://localhost:5001")
@@ -1,21 +1,351 @@
 # ai-gateway/app/api/v1/clients/ai_client.py
 # HTTP GET/POST 요청을 AI 서버의 엔드포인트로 전달
 
+import asyncio
+import hashlib
 import json
 import logging
+import time
+from contextlib import AsyncExitStack, contextmanager
+from typing import Optional
 import httpx
+from app.core import metrics, tracing
 from app.core.config import settings
-from app.services.file_service import FileService
+from app.api.v1.clients.batching import BatchEntry, MicroBatcher
+from app.api.v1.clients.concurrency import ai_limiter
+from app.api.v1.clients.multipart import FilePart, MultipartBody, file_size
+from app.api.v1.clients.ndjson import JSON_BACKEND, iter_ndjson
+from app.api.v1.clients.retry import LatencyWindow, call_with_retries, hedged
+from app.api.v1.clients.worker_pool import request_cost, worker_pool
+from app.services.audio_preprocessor import open_for_upload
+from app.services.file_service import FileService, run_io
 
 logger = logging.getLogger(__name__)
 file_service = FileService()
 
+# 엔드포인트별 최근 성공 요청 응답 시간 (헤징 지연 시간 계산용)
+_latencies = {"analyze": LatencyWindow(), "conversation": LatencyWindow()}
+
+# 이벤트 루프별 공유 AsyncClient (httpx 커넥션 풀은 생성된 루프에 묶여 있음)
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    http2 = settings.AI_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 패키지가 없어 HTTP/1.1로 동작합니다")
+            http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY_SEC,
+    )
+    return httpx.AsyncClient(limits=limits, http2=http2, timeout=_timeout(settings.AI_TIMEOUT_SEC))
+
+
+def _timeout(total_sec: float) -> httpx.Timeout:
+    return httpx.Timeout(total_sec, connect=settings.AI_CONNECT_TIMEOUT_SEC)
+
+
+def _stream_timeout(total_sec: float) -> httpx.Timeout:
+    # 스트리밍 응답은 청크 사이 대기(read)를 idle 타임아웃으로 제한하고, 전체 시간은 호출자가 제한
+    return httpx.Timeout(
+        total_sec, connect=settings.AI_CONNECT_TIMEOUT_SEC, read=settings.AI_STREAM_IDLE_TIMEOUT_SEC
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    현재 실행 중인 이벤트 루프의 공유 AsyncClient 반환 (없으면 생성)
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _clients[loop] = _build_client()
+        logger.info("AI 서버 HTTP 클라이언트 생성")
+    return client
+
+
+async def open_client():
+    """
+    현재 이벤트 루프의 공유 AsyncClient 생성 (루프 위에서 실행되어야 함)
+    """
+    get_client()
+
+
+async def close_client():
+    """
+    현재 이벤트 루프의 공유 AsyncClient 종료
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+        logger.info("AI 서버 HTTP 클라이언트 종료")
+
+
+@contextmanager
+def _observe_request(endpoint: str, worker_url: str):
+    """
+    AI 서버 요청 소요 시간을 엔드포인트/워커/결과별로 기록
+    """
+    started = time.monotonic()
+    outcome = "error"
+    try:
+        with tracing.span(f"ai.{endpoint}", worker=worker_url) as span:
+            yield span
+        outcome = "success"
+    finally:
+        metrics.AI_REQUEST_SECONDS.observe(
+            time.monotonic() - started, endpoint=endpoint, worker=worker_url, outcome=outcome
+        )
+
+
+def _trace_extensions(span: Optional[tracing.Span]) -> dict:
+    """
+    트레이스 중인 요청이면 httpx trace 확장으로 응답 헤더 수신(첫 바이트) 시점을 span 이벤트로 기록
+    """
+    if span is None:
+        return {}
+
+    async def on_event(event_name: str, info: dict):
+        if event_name.endswith(".receive_response_headers.complete"):
+            span.add_event("first_byte")
+
+    return {"trace": on_event}
+
+
 # AI 서버 헬스 체크 요청 프록시 함수
-async def ai_healthcheck():
-    async with httpx.AsyncClient(timeout=settings.AI_TIMEOUT_SEC) as client:
-        r = await client.get(f"{settings.AI_BASE_URL}/health")
-        r.raise_for_status()
-        return r.json()
+async def ai_healthcheck(base_url: Optional[str] = None, timeout=httpx.USE_CLIENT_DEFAULT):
+    r = await get_client().get(f"{base_url or settings.AI_BASE_URL}/health", timeout=timeout)
+    r.raise_for_status()
+    return r.json()
+
+
+def _form_data(task_id: str, analysis_request: dict) -> dict:
+    return {
+        "taskId": task_id,
+        "analysisRequest": json.dumps(analysis_request, ensure_ascii=False)
+    }
+
+
+def _open_part(file_path: str, endpoint: str, name: str, filename: str) -> FilePart:
+    """
+    업로드할 파일을 열고 크기 확인 (블로킹, 파일 I/O 스레드에서 실행)
+    음성 변환이 켜져 있으면 엔드포인트별 목표 형식으로 변환한 결과를 업로드
+    """
+    audio_file = open_for_upload(file_path, endpoint)
+    try:
+        return FilePart(name, filename, audio_file, file_size(audio_file), "audio/wav")
+    except BaseException:
+        audio_file.close()
+        raise
+
+
+async def _send_audio(
+    stack: AsyncExitStack,
+    endpoint: str,
+    file_path: str,
+    task_id: str,
+    data: dict,
+    timeout: httpx.Timeout,
+    exclude: frozenset = frozenset(),
+    used: Optional[list[str]] = None,
+    buffered: bool = False,
+) -> httpx.Response:
+    """
+    음성 파일 업로드 요청 1회를 보내고 응답 헤더까지 수신 (본문은 호출자가 스트리밍으로 읽음)
+    파일/동시성 한도/워커/응답은 stack이 닫힐 때 반환되므로, 본문을 다 읽을 때까지 워커를 점유
+    (재시도/헤징 시 시도마다 파일을 새로 열어 처음부터 전송)
+
+    Args:
+        stack: 요청 자원을 묶어 둘 AsyncExitStack
+        endpoint: AI 서버 엔드포인트 (analyze / conversation)
+        exclude: 선택에서 제외할 워커 URL
+        used: 선택된 워커 URL을 기록할 리스트 (헤징 요청의 exclude로 사용)
+        buffered: 서버가 결과를 다 만든 뒤 응답하는 요청 (동시성 한도용 응답 시간을 음성 길이로 나눔)
+    """
+    # 파일 열기 (청크 단위로 스트리밍 업로드, 전체를 메모리에 올리지 않음)
+    part = await run_io(_open_part, file_path, endpoint, "file", "audio.wav")
+    stack.enter_context(part.file)
+    return await _send_files(stack, endpoint, [part], data, task_id, timeout, exclude, used, buffered)
+
+
+async def _send_files(
+    stack: AsyncExitStack,
+    endpoint: str,
+    files: list[FilePart],
+    data: dict,
+    request_id: str,
+    timeout: httpx.Timeout,
+    exclude: frozenset = frozenset(),
+    used: Optional[list[str]] = None,
+    buffered: bool = False,
+) -> httpx.Response:
+    """
+    열린 파일들을 multipart로 업로드하고 응답 헤더까지 수신 (_send_audio / 배치 요청 공용)
+    파일은 청크마다 파일 I/O 스레드 풀에서 읽으면서 전송 (재시도 시에는 호출자가 파일을 새로 열어야 함)
+    request_id는 로그와 Idempotency-Key에 사용 (단건: taskId / 배치: 배치 ID)
+    """
+    # 적응형 동시성 한도 안에서, 워커 풀의 진행 중 요청이 가장 적은 AI 워커 선택
+    rtt_sample = await stack.enter_async_context(ai_limiter.acquire(endpoint))
+    worker = await stack.enter_async_context(worker_pool.acquire(exclude))
+    ai_url = worker.url
+    if used is not None:
+        used.append(ai_url)
+
+    logger.info(f"AI 서버 요청 시작: {ai_url}/{endpoint}, taskId={request_id}")
+
+    client = get_client()
+    span = stack.enter_context(_observe_request(endpoint, ai_url))
+    body = MultipartBody(data, files)
+    request = client.build_request(
+        "POST",
+        f"{ai_url}/{endpoint}",
+        content=body,
+        headers={
+            **body.headers,
+            "Idempotency-Key": request_id,  # 재시도/헤징 요청의 중복 처리 방지용
+        },
+        timeout=timeout,
+        extensions=_trace_extensions(span),
+    )
+    response = await client.send(request, stream=True)
+    rtt_sample.mark_response(request_cost.get() if buffered else 0.0)
+    stack.push_async_callback(response.aclose)
+    response.raise_for_status()
+    return response
+
+
+async def _post_audio(
+    endpoint: str,
+    file_path: str,
+    task_id: str,
+    data: dict,
+    timeout_sec: float,
+    exclude: frozenset = frozenset(),
+    used: Optional[list[str]] = None,
+) -> httpx.Response:
+    """
+    음성 파일 업로드 요청 1회 (응답 본문 전체 수신)
+    """
+    started = time.monotonic()
+    async with AsyncExitStack() as stack:
+        response = await _send_audio(
+            stack, endpoint, file_path, task_id, data, _timeout(timeout_sec), exclude, used, buffered=True
+        )
+        await response.aread()
+    _latencies[endpoint].record(time.monotonic() - started)
+    return response
+
+
+async def _open_stream(
+    endpoint: str, file_path: str, task_id: str, data: dict, timeout_sec: float, tried: list[str]
+):
+    """
+    음성 파일 업로드 요청 1회 (응답 헤더까지), 본문 스트리밍은 반환된 stack 안에서 진행
+    tried에 있는 워커는 다른 정상 워커가 있으면 제외하고, 이번에 선택된 워커를 tried에 추가
+
+    Returns:
+        (응답, 요청 자원을 묶은 AsyncExitStack)
+    """
+    async with AsyncExitStack() as stack:
+        response = await _send_audio(
+            stack,
+            endpoint,
+            file_path,
+            task_id,
+            data,
+            _stream_timeout(timeout_sec),
+            worker_pool.retry_exclude(tried),
+            tried,
+        )
+        return response, stack.pop_all()
+
+
+def _hedge_delay() -> Optional[float]:
+    """
+    /conversation 헤징 대기 시간 (최근 응답 시간 백분위, 표본이 부족하거나 워커가 1대면 헤징 안 함)
+    """
+    if not settings.AI_HEDGE_CONVERSATION or len(worker_pool.workers) < 2:
+        return None
+    delay = _latencies["conversation"].percentile(settings.AI_HEDGE_PERCENTILE)
+    if delay is None:
+        return None
+    return max(settings.AI_HEDGE_MIN_DELAY_SEC, delay)
+
+
+async def _open_batch_stream(entries: list[BatchEntry], batch_id: str, data: dict, tried: list[str]):
+    """
+    배치 업로드 요청 1회 (응답 헤더까지), 본문 스트리밍은 반환된 stack 안에서 진행
+    (재시도는 _open_stream과 같이 이미 시도한 워커를 피함)
+    """
+    async with AsyncExitStack() as stack:
+        files = []
+        for entry in entries:
+            part = await run_io(_open_part, entry.file_path, "analyze", "files", f"{entry.task_id}.wav")
+            stack.enter_context(part.file)
+            files.append(part)
+        response = await _send_files(
+            stack,
+            settings.AI_BATCH_ENDPOINT,
+            files,
+            data,
+            batch_id,
+            _stream_timeout(settings.AI_ANALYZE_TIMEOUT_SEC),
+            worker_pool.retry_exclude(tried),
+            tried,
+        )
+        return response, stack.pop_all()
+
+
+async def _run_analyze_batch(entries: list[BatchEntry]):
+    """
+    짧은 /analyze 작업 여러 건을 배치 엔드포인트로 한 번에 전송하고,
+    스트리밍 결과 라인을 taskId별로 각 작업에 전달
+    """
+    task_ids = [entry.task_id for entry in entries]
+    batch_id = "batch-" + hashlib.sha1("\n".join(task_ids).encode("utf-8")).hexdigest()[:16]
+    data = {
+        "taskIds": json.dumps(task_ids),
+        "analysisRequests": json.dumps([entry.analysis_request for entry in entries], ensure_ascii=False),
+    }
+    request_cost.set(sum(entry.cost for entry in entries))
+    logger.info(f"배치 분석 요청: {batch_id}, {len(entries)}건")
+
+    tried: list[str] = []
+    response, stack = await call_with_retries(
+        "analyze_batch", batch_id, lambda: _open_batch_stream(entries, batch_id, data, tried)
+    )
+    by_task = {entry.task_id: entry for entry in entries}
+    deadline = time.monotonic() + settings.AI_ANALYZE_TIMEOUT_SEC
+    async with stack:
+        async for line in iter_ndjson(response, settings.AI_STREAM_MAX_LINE_BYTES, deadline):
+            entry = by_task.get(line.get("taskId"))
+            if entry is None:
+                logger.warning(f"배치 결과의 taskId를 찾을 수 없음: {batch_id}, taskId={line.get('taskId')}")
+                continue
+            entry.deliver(line)
+
+
+# 짧은 /analyze 작업 마이크로 배처 (AI_BATCH_ENABLED일 때만 사용)
+analyze_batcher = MicroBatcher(
+    "analyze",
+    max_items=settings.AI_BATCH_MAX_ITEMS,
+    max_wait_sec=settings.AI_BATCH_MAX_WAIT_MS / 1000,
+    run_batch=_run_analyze_batch,
+)
+# 큐별 동시 처리 한도보다 큰 배치는 채워질 수 없으므로 한도로 제한 (한도가 바뀌면 main에서 다시 설정)
+analyze_batcher.set_limit(settings.JOB_MAX_IN_FLIGHT)
+
+
+def _batchable() -> bool:
+    # 길이를 아는 짧은 음성만 배치 (길이는 작업 시작 시 WAV 헤더 검증에서 설정)
+    cost = request_cost.get()
+    return settings.AI_BATCH_ENABLED and 0 < cost <= settings.AI_BATCH_MAX_CLIP_SEC
 
 
 # AI 서버 음성 파일 분석 함수
@@ -33,43 +363,36 @@ async def analyze_audio(file_path: str, task_id: str, analysis_request: dict):
         AI 서버 분석 결과 (score, feedback, etc.)
     """
     try:
-        # 1. 파일 읽기
-        logger.info(f"파일 읽기 시작: {file_path}")
-        audio_data = file_service.read_file(file_path) # bytes로 변환
-        logger.debug(f"파일 읽기 완료: {len(audio_data)} bytes")
-        
-        # 2. AI 서버에 전송
-        files = {
-            "file": ("audio.wav", audio_data, "audio/wav")
-        }
-        data = {
-            "taskId": task_id,
-            "analysisRequest": json.dumps(analysis_request, ensure_ascii=False)
-        }
-        
-        ai_url = settings.AI_BASE_URL  # 실제 AI 서버
-        
-        logger.info(f"AI 서버 요청 시작: {ai_url}/analyze, taskId={task_id}")
-        
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{ai_url}/analyze",
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
-
-            async for line in response.aiter_lines():
-                if line:
-                    try:
-                        data = json.loads(line)
-                        # type별로 분기해서 yield
-                        yield data
-                    except json.JSONDecodeError as e:
-                        logger.error(f"AI 응답 JSON 파싱 실패: {line[:100]}, error: {e}")
-                        # 파싱 실패한 라인은 건너뛰고 계속 처리
-                        continue
-                    
+        if _batchable():
+            # 짧은 음성은 다른 작업과 모아서 배치 엔드포인트로 전송, 이 작업의 결과 라인만 수신
+            entry = BatchEntry(file_path, task_id, analysis_request, request_cost.get())
+            analyze_batcher.submit(entry)
+            async for data in entry.lines():
+                yield data
+            logger.info(f"AI 서버 배치 요청 완료: {file_path}")
+            return
+
+        # 1. AI 서버에 전송 (일시적 오류는 백오프 후 다른 워커로 재시도)
+        logger.info(f"파일 열기 시작: {file_path}")
+        form = _form_data(task_id, analysis_request)
+        tried: list[str] = []
+        response, stack = await call_with_retries(
+            "analyze",
+            task_id,
+            lambda: _open_stream("analyze", file_path, task_id, form, settings.AI_ANALYZE_TIMEOUT_SEC, tried),
+        )
+
+        # 2. 결과 라인이 완성되는 즉시 yield (첫 결과까지의 시간이 사용자 체감 지연)
+        # 결과가 발행되기 시작한 뒤에는 중복 발행을 막기 위해 재시도하지 않음
+        deadline = time.monotonic() + settings.AI_ANALYZE_TIMEOUT_SEC
+        async with stack:
+            with tracing.span("ai.read_lines", json_backend=JSON_BACKEND) as span:
+                async for data in iter_ndjson(response, settings.AI_STREAM_MAX_LINE_BYTES, deadline):
+                    if span is not None:
+                        span.add_event("line", type=data.get("type"))
+                    # type별로 분기해서 yield
+                    yield data
+
         logger.info(f"AI 서버 요청 완료: {file_path}")
 
     except FileNotFoundError as e:
@@ -86,6 +409,56 @@ async def analyze_audio(file_path: str, task_id: str, analysis_request: dict):
         raise
 
 
+# AI 서버 대화 분석 함수 (스트리밍)
+async def conversation_stream(file_path: str, task_id: str, analysis_request: dict):
+    """
+    음성 파일을 AI 서버로 전송하여 대화 분석
+    스트리밍 방식 - 부분 전사(transcript) / 응답 토큰(token) / 최종 결과(final) 청크를 도착 즉시 yield
+    (결과가 전달되기 시작한 뒤에는 재시도/헤징하지 않음)
+    
+    Args:
+        file_path: 분석할 음성 파일 경로 (/shared/audio/xxx.wav)
+        task_id: 작업 ID
+        analysis_request: 분석 요청 데이터 (dict)
+    """
+    try:
+        # 1. AI 서버에 스트리밍 모드로 전송 (응답 헤더까지는 일시적 오류 재시도)
+        logger.info(f"대화 파일 열기 시작: {file_path}")
+        form = {**_form_data(task_id, analysis_request), "stream": "true"}
+        tried: list[str] = []
+        response, stack = await call_with_retries(
+            "conversation",
+            task_id,
+            lambda: _open_stream(
+                "conversation", file_path, task_id, form, settings.AI_CONVERSATION_TIMEOUT_SEC, tried
+            ),
+        )
+
+        # 2. 청크가 완성되는 즉시 yield
+        deadline = time.monotonic() + settings.AI_CONVERSATION_TIMEOUT_SEC
+        async with stack:
+            with tracing.span("ai.read_lines", json_backend=JSON_BACKEND) as span:
+                async for chunk in iter_ndjson(response, settings.AI_STREAM_MAX_LINE_BYTES, deadline):
+                    if span is not None:
+                        span.add_event("chunk", event=chunk.get("event"))
+                    yield chunk
+
+        logger.info(f"대화 AI 서버 요청 완료: {file_path}")
+
+    except FileNotFoundError as e:
+        logger.error(f"대화 파일 없음: {file_path}")
+        raise
+    except httpx.TimeoutException:
+        logger.error(f"대화 AI 서버 타임아웃: {file_path}")
+        raise Exception("대화 AI 서버 응답 타임아웃")
+    except httpx.HTTPStatusError as e:
+        logger.error(f"대화 AI 서버 HTTP 에러: {file_path}, status: {e.response.status_code}")
+        raise Exception(f"대화 AI 서버 에러: {e.response.status_code}")
+    except Exception as e:
+        logger.error(f"대화 AI 서버 통신 실패: {file_path}, error: {e}")
+        raise
+
+
 # AI 서버 대화 분석 함수
 async def conversation_audio(file_path: str, task_id: str, analysis_request: dict):
     """
@@ -101,35 +474,33 @@ async def conversation_audio(file_path: str, task_id: str, analysis_request: dic
         AI 서버 분석 결과 (dict)
     """
     try:
-        # 1. 파일 읽기
-        logger.info(f"대화 파일 읽기 시작: {file_path}")
-        audio_data = file_service.read_file(file_path) # bytes로 변환
-        logger.debug(f"대화 파일 읽기 완료: {len(audio_data)} bytes")
-        
-        # 2. AI 서버에 전송
-        files = {
-            "file": ("audio.wav", audio_data, "audio/wav")
-        }
-        data = {
-            "taskId": task_id,
-            "analysisRequest": json.dumps(analysis_request, ensure_ascii=False)
-        }
-        
-        ai_url = settings.AI_BASE_URL  # 실제 AI 서버
-        
-        logger.info(f"대화 AI 서버 요청 시작: {ai_url}/conversation, taskId={task_id}")
-        
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                f"{ai_url}/conversation",
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            logger.info(f"대화 AI 서버 요청 완료: {file_path}")
-            return result
+        # 1. AI 서버에 전송 (일시적 오류는 다른 워커로 재시도, 응답이 늦으면 다른 워커로 헤징)
+        logger.info(f"대화 파일 열기 시작: {file_path}")
+        form = _form_data(task_id, analysis_request)
+        tried: list[str] = []  # 재시도/헤징 요청이 이미 시도한 워커를 피하도록 기록
+
+        async def attempt() -> httpx.Response:
+            def request():
+                return _post_audio(
+                    "conversation",
+                    file_path,
+                    task_id,
+                    form,
+                    settings.AI_CONVERSATION_TIMEOUT_SEC,
+                    exclude=worker_pool.retry_exclude(tried),
+                    used=tried,
+                )
+
+            delay = _hedge_delay()
+            if delay is None:
+                return await request()
+            return await hedged("conversation", delay, request)
+
+        response = await call_with_retries("conversation", task_id, attempt)
+
+        result = response.json()
+        logger.info(f"대화 AI 서버 요청 완료: {file_path}")
+        return result
 
     except FileNotFoundError as e:
         logger.error(f"대화 파일 없음: {file_path}")
@@ -0,0 +1,132 @@
+# ai-gateway/app/api/v1/clients/batching.py
+# 짧은 작업 마이크로 배칭 (최대 대기 시간 / 최대 개수 단위로 모아서 한 번에 요청)
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MissingBatchResultError(Exception):
+    """
+    배치 요청은 성공했지만 응답에 해당 작업의 결과가 없음
+    """
+
+
+class BatchEntry:
+    """
+    배치에 포함된 작업 하나 - 배치 응답에서 이 작업의 결과 라인만 전달받는 큐
+    """
+
+    __slots__ = ("file_path", "task_id", "analysis_request", "cost", "delivered", "_lines", "_finished")
+
+    def __init__(self, file_path: str, task_id: str, analysis_request: dict, cost: float = 0.0):
+        self.file_path = file_path
+        self.task_id = task_id
+        self.analysis_request = analysis_request
+        self.cost = cost
+        self.delivered = 0
+        self._lines: asyncio.Queue = asyncio.Queue()
+        self._finished = False
+
+    def deliver(self, line: dict):
+        if not self._finished:
+            self.delivered += 1
+            self._lines.put_nowait((line, None))
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        결과 전달 종료 (error가 있으면 lines()를 읽는 쪽에서 예외 발생, 여러 번 호출해도 한 번만 반영)
+        """
+        if not self._finished:
+            self._finished = True
+            self._lines.put_nowait((None, error or StopAsyncIteration()))
+
+    async def lines(self):
+        """
+        배치 응답에서 이 작업의 결과 라인을 도착 순서대로 yield
+        """
+        while True:
+            line, end = await self._lines.get()
+            if end is None:
+                yield line
+            elif isinstance(end, StopAsyncIteration):
+                return
+            else:
+                raise end
+
+
+class MicroBatcher:
+    """
+    작업을 max_wait_sec 동안 또는 max_items개가 찰 때까지 모아서 run_batch(entries) 한 번으로 처리
+    - run_batch는 각 entry에 결과 라인을 deliver하고, 끝나면 배처가 모든 entry를 finish
+    - 배치 응답에 결과 라인이 하나도 없는 작업은 실패 처리 (조용히 완료되어 결과가 유실되지 않도록)
+    - run_batch가 실패하면 배치의 모든 작업에 같은 예외 전달
+    - 배치 요청은 제출한 작업과 별개의 태스크로 실행 (첫 작업의 트레이스/컨텍스트를 물려받지 않음)
+    (디스패처 이벤트 루프 위에서만 사용)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_items: int,
+        max_wait_sec: float,
+        run_batch: Callable[[list[BatchEntry]], Awaitable[Any]],
+    ):
+        self.name = name
+        self.configured_max_items = max_items
+        self.max_items = max_items
+        self.max_wait_sec = max_wait_sec
+        self.run_batch = run_batch
+        self._pending: list[BatchEntry] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def set_limit(self, limit: int):
+        """
+        배치 크기를 동시 처리 한도 이하로 제한 (한도보다 큰 배치는 채워지지 않고 매번 최대 대기 시간만큼 기다림)
+        """
+        self.max_items = max(1, min(self.configured_max_items, limit))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+
+    def submit(self, entry: BatchEntry):
+        self._pending.append(entry)
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_sec, self._flush)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[BatchEntry]):
+        metrics.AI_BATCH_SIZE.observe(len(batch), endpoint=self.name)
+        try:
+            await self.run_batch(batch)
+        except BaseException as e:
+            if not isinstance(e, asyncio.CancelledError):
+                logger.error(f"배치 요청 실패: {self.name}, {len(batch)}건, error: {e}")
+            for entry in batch:
+                entry.finish(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        else:
+            for entry in batch:
+                if entry.delivered:
+                    entry.finish()
+                else:
+                    logger.warning(f"배치 응답에 결과 없음: {self.name}, taskId={entry.task_id}")
+                    entry.finish(MissingBatchResultError(f"배치 응답에 결과가 없습니다: taskId={entry.task_id}"))
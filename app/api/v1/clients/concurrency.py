@@ -0,0 +1,182 @@
+# ai-gateway/app/api/v1/clients/concurrency.py
+# AI 서버 요청 적응형 동시성 제한 (응답 시간 기반 AIMD)
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+import httpx
+
+from app.api.v1.clients.worker_pool import NoAvailableWorkerError
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RttSample:
+    """
+    요청 하나의 응답 시간 표본
+    - 요청 시작부터 응답 헤더 도착까지를 측정 (스트리밍 본문을 읽는 시간은 음성 길이에 비례하므로 제외)
+    - 응답을 다 만든 뒤 헤더를 보내는 엔드포인트는 음성 길이(초)로 나눈 값을 사용
+    """
+
+    __slots__ = ("endpoint", "started", "responded_at", "cost")
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.monotonic()
+        self.responded_at: Optional[float] = None
+        self.cost = 0.0
+
+    def mark_response(self, cost: float = 0.0):
+        """
+        응답 헤더 도착 시점 기록
+
+        Args:
+            cost: 응답 시간을 나눌 음성 길이(초), 0이면 그대로 사용
+        """
+        if self.responded_at is None:
+            self.responded_at = time.monotonic()
+            self.cost = cost
+
+    def rtt(self) -> float:
+        elapsed = (self.responded_at or time.monotonic()) - self.started
+        return elapsed / self.cost if self.cost > 0 else elapsed
+
+
+class AdaptiveLimiter:
+    """
+    AI 서버로 나가는 동시 요청 수를 응답 시간에 맞춰 조절하는 리미터
+    - 응답 시간: RttSample 참고 (응답 헤더까지, 표시가 없으면 요청 블록 종료까지)
+    - 기준 응답 시간(min_rtt): 엔드포인트별 최근 구간의 최소 응답 시간, 주기적으로 초기화해 워커 변화에 적응
+    - 응답 시간이 기준의 tolerance 배 이내이고 한도의 절반 이상 사용 중이면 한도 +1/limit (요청 한 사이클에 +1)
+    - 응답 시간이 기준을 넘거나 오류가 나면 한도 x backoff_ratio (응답 시간 한 번에 최대 1회)
+    - 정수 한도가 바뀌면 리스너 호출 (디스패처 예산 / Consumer prefetch 반영)
+    (디스패처 이벤트 루프 위에서만 사용)
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float,
+        backoff_ratio: float,
+        rtt_window_sec: float,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff_ratio = backoff_ratio
+        self.rtt_window_sec = rtt_window_sec
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.min_rtt: dict[str, float] = {}
+        self.last_rtt: dict[str, float] = {}
+        self._min_rtt_reset_at: dict[str, float] = {}
+        self._last_decrease_at = 0.0
+        self._changed = asyncio.Condition()
+        self._listeners: list[Callable[[int], None]] = []
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def add_listener(self, callback: Callable[[int], None]):
+        """
+        정수 한도가 바뀔 때 호출될 콜백 등록
+        """
+        self._listeners.append(callback)
+
+    @asynccontextmanager
+    async def acquire(self, endpoint: str):
+        """
+        한도 안에서 요청 하나를 점유하고, 응답 시간/오류를 한도 조절에 반영
+        점유는 블록이 끝날 때(스트림을 닫을 때)까지 유지, 응답 헤더가 오면 yield한 RttSample에 표시
+        4xx 응답은 요청 자체의 문제이므로 응답 시간만 기록
+        """
+        async with self._changed:
+            while self.in_flight >= self.limit:
+                await self._changed.wait()
+            self.in_flight += 1
+
+        saturated = self.in_flight * 2 >= self.limit
+        sample = RttSample(endpoint)
+        dropped = False
+        cancelled = False
+        try:
+            yield sample
+        except httpx.HTTPStatusError as e:
+            dropped = e.response.status_code >= 500
+            raise
+        except (asyncio.CancelledError, NoAvailableWorkerError):
+            # 헤징에서 진 요청이나 워커를 받지 못한 요청은 표본에서 제외
+            cancelled = True
+            raise
+        except Exception:
+            dropped = True
+            raise
+        finally:
+            self.in_flight -= 1
+            if not cancelled:
+                self._on_sample(sample.endpoint, sample.rtt(), dropped, saturated)
+            async with self._changed:
+                self._changed.notify_all()
+
+    def _on_sample(self, endpoint: str, rtt: float, dropped: bool, saturated: bool):
+        previous = self.limit
+        now = time.monotonic()
+
+        if not dropped:
+            self.last_rtt[endpoint] = rtt
+            min_rtt = self.min_rtt.get(endpoint)
+            if min_rtt is None or rtt < min_rtt or now >= self._min_rtt_reset_at[endpoint]:
+                self.min_rtt[endpoint] = rtt
+                self._min_rtt_reset_at[endpoint] = now + self.rtt_window_sec
+
+        if not self.enabled:
+            return
+        min_rtt = self.min_rtt.get(endpoint)
+        if dropped or min_rtt is None or rtt > min_rtt * self.tolerance:
+            # 한 번의 과부하가 진행 중인 여러 요청에서 중복으로 감소시키지 않도록 응답 시간 간격으로 제한
+            if now - self._last_decrease_at >= (min_rtt or rtt):
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self._last_decrease_at = now
+        elif saturated:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+        if self.limit != previous:
+            logger.debug(
+                f"AI 동시성 한도 변경: {previous} -> {self.limit} "
+                f"({endpoint} rtt={rtt:.3f}s, min_rtt={min_rtt or 0:.3f}s, error={dropped})"
+            )
+            for callback in self._listeners:
+                try:
+                    callback(self.limit)
+                except Exception as e:
+                    logger.error(f"동시성 한도 리스너 실패: {e}")
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "min_rtt_ms": {endpoint: rtt * 1000 for endpoint, rtt in self.min_rtt.items()},
+            "last_rtt_ms": {endpoint: rtt * 1000 for endpoint, rtt in self.last_rtt.items()},
+        }
+
+
+ai_limiter = AdaptiveLimiter(
+    initial_limit=settings.JOB_GLOBAL_MAX_IN_FLIGHT,
+    min_limit=settings.AI_CONCURRENCY_MIN,
+    max_limit=settings.AI_CONCURRENCY_MAX,
+    tolerance=settings.AI_CONCURRENCY_LATENCY_TOLERANCE,
+    backoff_ratio=settings.AI_CONCURRENCY_BACKOFF_RATIO,
+    rtt_window_sec=settings.AI_CONCURRENCY_RTT_WINDOW_SEC,
+    enabled=settings.AI_ADAPTIVE_CONCURRENCY,  # False면 한도를 JOB_GLOBAL_MAX_IN_FLIGHT로 고정
+)
+metrics.AI_CONCURRENCY_LIMIT.set_function(lambda: {(): ai_limiter.limit})
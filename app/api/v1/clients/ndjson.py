@@ -0,0 +1,112 @@
+# ai-gateway/app/api/v1/clients/ndjson.py
+# 스트리밍 NDJSON 응답 점진 파서 (라인 크기 제한, orjson 우선 사용)
+
+import json
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:  # orjson이 없으면 표준 json 사용
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+
+class NDJSONParser:
+    """
+    바이트 청크를 받아 완성된 라인부터 JSON으로 변환하는 파서
+    - 버퍼에서 이미 검사한 위치 이후만 줄바꿈을 찾으므로 긴 라인도 선형 시간에 처리
+    - max_line_bytes를 넘는 라인은 다음 줄바꿈까지 버리고 건너뜀
+    - JSON 파싱에 실패한 라인은 로그만 남기고 건너뜀
+    """
+
+    def __init__(self, max_line_bytes: int):
+        self.max_line_bytes = max_line_bytes
+        self._buffer = bytearray()
+        self._scanned = 0  # 버퍼에서 줄바꿈이 없다고 확인된 길이
+        self._skipping = False  # 크기 초과 라인을 버리는 중
+        self.skipped_lines = 0
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        results = []
+        self._buffer += chunk
+        while True:
+            newline = self._buffer.find(b"\n", self._scanned)
+            if newline < 0:
+                self._scanned = len(self._buffer)
+                if self._scanned > self.max_line_bytes:
+                    if not self._skipping:
+                        self._skip_line(self._scanned)
+                        self._skipping = True
+                    self._buffer.clear()
+                    self._scanned = 0
+                return results
+
+            line = bytes(self._buffer[:newline])
+            del self._buffer[: newline + 1]
+            self._scanned = 0
+            if self._skipping:
+                # 크기 초과 라인의 나머지 부분
+                self._skipping = False
+                continue
+            if len(line) > self.max_line_bytes:
+                self._skip_line(len(line))
+                continue
+            parsed = self._parse(line)
+            if parsed is not None:
+                results.append(parsed)
+
+    def close(self) -> list[dict]:
+        """
+        스트림 종료 시 줄바꿈 없이 끝난 마지막 라인 처리
+        """
+        if self._skipping or not self._buffer:
+            return []
+        line = bytes(self._buffer)
+        self._buffer.clear()
+        parsed = self._parse(line)
+        return [parsed] if parsed is not None else []
+
+    def _skip_line(self, size: int):
+        self.skipped_lines += 1
+        metrics.NDJSON_SKIPPED_LINES_TOTAL.inc(reason="too_large")
+        logger.error(f"AI 응답 라인 크기 초과로 건너뜀: {size} bytes 이상 (제한 {self.max_line_bytes} bytes)")
+
+    def _parse(self, line: bytes) -> Optional[dict]:
+        if not line.strip():
+            return None
+        try:
+            return _loads(line)
+        except ValueError as e:
+            self.skipped_lines += 1
+            metrics.NDJSON_SKIPPED_LINES_TOTAL.inc(reason="invalid_json")
+            logger.error(f"AI 응답 JSON 파싱 실패: {line[:100]!r}, error: {e}")
+            return None
+
+
+async def iter_ndjson(response: httpx.Response, max_line_bytes: int, deadline: float) -> AsyncIterator[dict]:
+    """
+    스트리밍 응답을 청크 단위로 읽으면서 완성된 결과를 바로 yield
+    청크 사이 대기 시간은 httpx read 타임아웃(idle)으로, 전체 시간은 deadline(monotonic)으로 제한
+
+    Raises:
+        httpx.ReadTimeout: 청크 사이 대기 시간 또는 전체 응답 시간 초과
+    """
+    parser = NDJSONParser(max_line_bytes)
+    async for chunk in response.aiter_bytes():
+        for result in parser.feed(chunk):
+            yield result
+        if time.monotonic() > deadline:
+            raise httpx.ReadTimeout("AI 서버 전체 응답 시간 초과", request=response.request)
+    for result in parser.close():
+        yield result
@@ -0,0 +1,157 @@
+# ai-gateway/app/api/v1/clients/retry.py
+# AI 서버 요청 재시도 (지수 백오프 + 지터, 재시도 예산) 및 헤징
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 일시적인 장애로 보고 재시도하는 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    연결 실패/타임아웃/일시적 5xx만 재시도 (서킷 open, 4xx, 파일 오류는 재시도하지 않음)
+    """
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class RetryBudget:
+    """
+    재시도(헤징 포함)가 전체 요청의 일정 비율을 넘지 않도록 하는 토큰 예산
+    - 요청 1건마다 ratio 토큰 적립, 재시도 1건마다 1 토큰 사용
+    - 트래픽이 적을 때를 위해 초당 min_per_sec 토큰은 항상 보충
+    - 최대 적립량은 요청 100건 + 10초 분량 (장애 직후 재시도 폭주 방지)
+    """
+
+    def __init__(self, ratio: float, min_per_sec: float):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_tokens = max(1.0, ratio * 100 + min_per_sec * 10)
+        self._tokens = self.max_tokens
+        self._updated_at = time.monotonic()
+
+    def _refill(self, amount: float):
+        now = time.monotonic()
+        amount += (now - self._updated_at) * self.min_per_sec
+        self._updated_at = now
+        self._tokens = min(self.max_tokens, self._tokens + amount)
+
+    def record_request(self):
+        self._refill(self.ratio)
+
+    def try_withdraw(self) -> bool:
+        self._refill(0)
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class LatencyWindow:
+    """
+    최근 성공 요청 응답 시간 (헤징 지연 시간 계산용)
+    """
+
+    def __init__(self, size: int = 200):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self._samples) < settings.AI_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+retry_budget = RetryBudget(settings.AI_RETRY_BUDGET_RATIO, settings.AI_RETRY_BUDGET_MIN_PER_SEC)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    attempt번째 재시도 전 대기 시간 (full jitter 지수 백오프)
+    """
+    ceiling = min(settings.AI_RETRY_MAX_DELAY_SEC, settings.AI_RETRY_BASE_DELAY_SEC * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+async def call_with_retries(endpoint: str, task_id: str, request: Callable[[], Awaitable[T]]) -> T:
+    """
+    재시도 정책에 따라 request() 실행
+
+    Args:
+        endpoint: 메트릭/로그용 엔드포인트 이름
+        task_id: 작업 ID (로그용, 요청에는 Idempotency-Key로 전달)
+        request: 한 번의 시도를 수행하는 코루틴 함수
+
+    Raises:
+        마지막 시도의 예외 (재시도 불가 오류이거나 횟수/예산 소진 시)
+    """
+    attempt = 1
+    while True:
+        retry_budget.record_request()
+        try:
+            return await request()
+        except Exception as e:
+            if attempt >= settings.AI_RETRY_MAX_ATTEMPTS or not is_retryable(e):
+                raise
+            if not retry_budget.try_withdraw():
+                metrics.AI_RETRIES_TOTAL.inc(endpoint=endpoint, outcome="budget_exhausted")
+                logger.warning(f"재시도 예산 소진으로 재시도 생략: {endpoint}, taskId={task_id}")
+                raise
+            delay = backoff_delay(attempt)
+            metrics.AI_RETRIES_TOTAL.inc(endpoint=endpoint, outcome="retried")
+            logger.warning(
+                f"AI 서버 요청 재시도 ({attempt}/{settings.AI_RETRY_MAX_ATTEMPTS - 1}): "
+                f"{endpoint}, taskId={task_id}, {delay:.2f}s 후, error: {e!r}"
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+async def hedged(endpoint: str, delay: float, request: Callable[[], Awaitable[T]]) -> T:
+    """
+    request()가 delay초 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 성공한 결과 사용
+    (나머지 요청은 취소, 헤징 요청도 재시도 예산을 사용)
+    """
+    primary = asyncio.ensure_future(request())
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not retry_budget.try_withdraw():
+            return await primary
+
+        logger.info(f"AI 서버 헤징 요청 시작: {endpoint}, {delay:.2f}s 경과")
+        hedge = asyncio.ensure_future(request())
+        tasks.append(hedge)
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    metrics.AI_HEDGES_TOTAL.inc(endpoint=endpoint, winner="hedge" if task is hedge else "primary")
+                    return task.result()
+                if error is None or task is primary:
+                    error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,290 @@
+# ai-gateway/app/api/v1/clients/worker_pool.py
+# AI 워커 풀 라우팅 (least-outstanding-requests 선택 + 워커별 동시성 제한 + 헬스 프로빙 / 서킷 브레이커)
+
+import asyncio
+import contextvars
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 현재 작업이 워커에 주는 부하 추정치 (음성 길이, 초) - 작업 코루틴에서 설정, 알 수 없으면 0
+request_cost: contextvars.ContextVar[float] = contextvars.ContextVar("request_cost", default=0.0)
+
+
+class NoAvailableWorkerError(Exception):
+    """모든 AI 워커의 서킷이 열려 있어 요청을 보낼 수 없음"""
+
+
+class CircuitBreaker:
+    """
+    워커 한 대의 서킷 브레이커
+    - closed: 정상, 연속 실패가 임계치에 도달하면 open
+    - open: 요청 차단, 대기 시간이 지나면 half_open
+    - half_open: 시험 요청만 허용, 성공하면 closed / 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, open_sec: float, half_open_max_requests: int):
+        self.failure_threshold = failure_threshold
+        self.open_sec = open_sec
+        self.half_open_max_requests = half_open_max_requests
+        self.consecutive_failures = 0
+        self.trial_in_flight = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.open_sec:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allows_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            return self.trial_in_flight < self.half_open_max_requests
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._opened_at = None
+
+    def half_open(self):
+        if self.state == self.OPEN:
+            self._opened_at = time.monotonic() - self.open_sec
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+class AIWorker:
+    """
+    AI 워커 한 대의 라우팅 상태
+    """
+
+    def __init__(self, url: str, max_concurrency: int):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.load_sec = 0.0  # 진행 중 요청의 음성 길이 합
+        self.breaker = CircuitBreaker(
+            settings.AI_WORKER_EJECT_AFTER_FAILURES,
+            settings.AI_CIRCUIT_OPEN_SEC,
+            settings.AI_CIRCUIT_HALF_OPEN_MAX_REQUESTS,
+        )
+        self.probe_latency_ms: Optional[float] = None  # 헬스 프로브 응답 시간 (EWMA)
+        self.probe_errors = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    @property
+    def has_capacity(self) -> bool:
+        return self.in_flight < self.max_concurrency
+
+    def record_probe(self, latency_ms: float):
+        if self.probe_latency_ms is None:
+            self.probe_latency_ms = latency_ms
+        else:
+            alpha = settings.AI_WORKER_PROBE_EWMA_ALPHA
+            self.probe_latency_ms = alpha * latency_ms + (1 - alpha) * self.probe_latency_ms
+
+    def snapshot(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "circuit": self.breaker.state,
+            "in_flight": self.in_flight,
+            "load_sec": round(self.load_sec, 3),
+            "max_concurrency": self.max_concurrency,
+            "probe_latency_ms": self.probe_latency_ms,
+            "probe_errors": self.probe_errors,
+            "last_error": self.last_error,
+        }
+
+
+class WorkerPool:
+    """
+    여러 AI 워커에 요청을 분산하는 라우터
+    - 서킷이 닫힌 워커 중 진행 중 음성 길이 합(load_sec)이 가장 작은 워커 선택
+      (길이를 모르면 진행 중 요청 수로 비교, 동률이면 무작위)
+    - 워커별 동시 요청 수 상한, 여유가 없으면 반환될 때까지 대기
+    - 모든 워커의 서킷이 열려 있으면 즉시 실패 (NoAvailableWorkerError)
+    - 백그라운드 프로버가 워커별 응답 시간/에러를 기록하고 서킷 상태에 반영
+    (디스패처 이벤트 루프 위에서만 사용)
+    """
+
+    def __init__(self, urls: list[str], max_concurrency: int):
+        self.workers = [AIWorker(url, max_concurrency) for url in urls]
+        self._changed = asyncio.Condition()
+        self._health_task: Optional[asyncio.Task] = None
+        self._listeners: list[Callable[[bool], None]] = []
+        self._available = True
+
+    def add_listener(self, callback: Callable[[bool], None]):
+        """
+        사용 가능한 워커 유무가 바뀔 때 호출될 콜백 등록 (예: Consumer 일시 정지/재개)
+        """
+        self._listeners.append(callback)
+
+    def _update_availability(self):
+        available = any(w.healthy for w in self.workers)
+        if available == self._available:
+            return
+        self._available = available
+        if available:
+            logger.info("AI 워커 서킷 복구: 요청 재개")
+        else:
+            logger.warning("모든 AI 워커 서킷 open: 요청 차단")
+        for callback in self._listeners:
+            try:
+                callback(available)
+            except Exception as e:
+                logger.error(f"워커 상태 리스너 실패: {e}")
+
+    def _select(self, exclude: frozenset = frozenset()) -> Optional[AIWorker]:
+        candidates = [
+            w for w in self.workers if w.url not in exclude and w.has_capacity and w.breaker.allows_request()
+        ]
+        if not candidates:
+            return None
+        random.shuffle(candidates)
+        return min(candidates, key=lambda w: (w.load_sec, w.in_flight))
+
+    def retry_exclude(self, tried) -> frozenset:
+        """
+        재시도 요청에서 제외할 워커 URL (이미 시도한 워커, 다른 정상 워커가 없으면 같은 워커로 재시도)
+        """
+        tried = frozenset(tried)
+        if any(w.healthy and w.url not in tried for w in self.workers):
+            return tried
+        return frozenset()
+
+    @asynccontextmanager
+    async def acquire(self, exclude: frozenset = frozenset()):
+        """
+        요청을 보낼 워커를 하나 점유
+        블록 안에서 발생한 연결 오류/타임아웃/5xx 응답은 서킷 실패로 기록
+
+        Args:
+            exclude: 선택에서 제외할 워커 URL (예: 헤징 요청은 첫 요청과 다른 워커로)
+
+        Yields:
+            선택된 AIWorker (블록을 벗어나면 반환)
+
+        Raises:
+            NoAvailableWorkerError: 모든 워커의 서킷이 열려 있거나, 제외되지 않은 정상 워커가 없을 때
+        """
+        async with self._changed:
+            worker = self._select(exclude)
+            while worker is None:
+                self._update_availability()
+                if not self._available:
+                    raise NoAvailableWorkerError("사용 가능한 AI 워커가 없습니다 (circuit open)")
+                if exclude and all(w.url in exclude for w in self.workers if w.healthy):
+                    raise NoAvailableWorkerError("제외 대상 외에 사용 가능한 AI 워커가 없습니다")
+                await self._changed.wait()
+                worker = self._select(exclude)
+            trial = worker.breaker.state == CircuitBreaker.HALF_OPEN
+            cost = request_cost.get()
+            worker.in_flight += 1
+            worker.load_sec += cost
+            if trial:
+                worker.breaker.trial_in_flight += 1
+
+        try:
+            yield worker
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                self._record_failure(worker, e)
+            else:
+                worker.breaker.record_success()
+            raise
+        except (httpx.TransportError, asyncio.TimeoutError) as e:
+            self._record_failure(worker, e)
+            raise
+        else:
+            worker.breaker.record_success()
+        finally:
+            worker.in_flight -= 1
+            worker.load_sec = max(0.0, worker.load_sec - cost)
+            if trial:
+                worker.breaker.trial_in_flight -= 1
+            async with self._changed:
+                self._update_availability()
+                self._changed.notify_all()
+
+    def _record_failure(self, worker: AIWorker, error: Exception):
+        was_open = not worker.healthy
+        worker.breaker.record_failure()
+        worker.last_error = str(error) or type(error).__name__
+        if not was_open and not worker.healthy:
+            logger.warning(f"AI 워커 서킷 open: {worker.url}, error: {worker.last_error}")
+
+    async def _probe_worker(self, worker: AIWorker):
+        from app.api.v1.clients.ai_client import ai_healthcheck
+
+        started = time.monotonic()
+        try:
+            # 응답하지 않는 워커 하나가 프로브 라운드 전체를 붙잡지 않도록 짧은 타임아웃 사용
+            await ai_healthcheck(worker.url, timeout=settings.AI_WORKER_HEALTHCHECK_TIMEOUT_SEC)
+        except Exception as e:
+            worker.probe_errors += 1
+            self._record_failure(worker, e)
+            return
+
+        worker.record_probe((time.monotonic() - started) * 1000)
+        if worker.breaker.state == CircuitBreaker.CLOSED:
+            worker.breaker.record_success()
+        elif worker.breaker.state == CircuitBreaker.OPEN:
+            # 프로브가 성공하면 바로 닫지 않고 실제 요청으로 복구 여부를 시험
+            worker.breaker.half_open()
+            logger.info(f"AI 워커 서킷 half-open: {worker.url}")
+
+    async def _run_health_checks(self):
+        while True:
+            await asyncio.gather(*(self._probe_worker(w) for w in self.workers))
+            async with self._changed:
+                self._update_availability()
+                self._changed.notify_all()
+            await asyncio.sleep(settings.AI_WORKER_HEALTHCHECK_INTERVAL_SEC)
+
+    async def start_health_checks(self):
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._run_health_checks())
+            logger.info(f"AI 워커 헬스체크 시작: {[w.url for w in self.workers]}")
+
+    async def stop_health_checks(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+
+    def snapshot(self) -> list[dict]:
+        return [w.snapshot() for w in self.workers]
+
+
+# WORKER_URLS가 비어 있으면 AI_BASE_URL 단일 워커로 동작
+worker_pool = WorkerPool(
+    settings.worker_urls_list or [settings.AI_BASE_URL.rstrip("/")],
+    settings.AI_WORKER_MAX_CONCURRENCY,
+)
+metrics.AI_WORKER_IN_FLIGHT.set_function(lambda: {(w.url,): w.in_flight for w in worker_pool.workers})
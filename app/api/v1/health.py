@@ -3,6 +3,9 @@
 
 from fastapi import APIRouter
 from app.core.config import settings
+from app.api.v1.clients.concurrency import ai_limiter
+from app.api.v1.clients.worker_pool import worker_pool
+from app.services.file_cleaner import file_cleaner
 
 router = APIRouter()
 
@@ -12,4 +15,7 @@ def health():
     return {
         "status": "ok",
         "workers_configured": bool(settings.worker_urls_list),
+        "workers": worker_pool.snapshot(),
+        "concurrency": ai_limiter.snapshot(),
+        "file_cleanup": file_cleaner.stats(),
     }
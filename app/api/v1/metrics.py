@@ -0,0 +1,14 @@
+# ai-gateway/app/api/v1/metrics.py
+# Prometheus 메트릭 엔드포인트
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import metrics
+
+router = APIRouter()
+
+# 작업 파이프라인 메트릭 (Prometheus 텍스트 포맷)
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
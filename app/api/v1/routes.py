@@ -6,10 +6,14 @@ import httpx
 
 from app.api.v1.clients.ai_client import ai_healthcheck
 from app.api.v1.health import router as health_router
+from app.api.v1.metrics import router as metrics_router
+from app.api.v1.traces import router as traces_router
 
 router = APIRouter()
 
 router.include_router(health_router, prefix="/health", tags=["health"])
+router.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
+router.include_router(traces_router, prefix="/traces", tags=["traces"])
 
 # AI 서버 헬스 체크 프록시 엔드포인트
 @router.get("/ai/health")
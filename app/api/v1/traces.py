@@ -0,0 +1,26 @@
+# ai-gateway/app/api/v1/traces.py
+# 작업 단계별 트레이스 조회 엔드포인트
+
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException
+
+from app.core import tracing
+
+router = APIRouter()
+
+# 최근 완료된 (샘플링된) 작업 트레이스 목록
+@router.get("")
+def list_traces(limit: int = 50, format: Literal["json", "otlp"] = "json"):
+    traces = tracing.recent_traces(limit)
+    if format == "otlp":
+        return {"resourceSpans": [rs for t in traces for rs in t.to_otlp()["resourceSpans"]]}
+    return {"traces": [t.to_dict() for t in traces]}
+
+# taskId 단위 트레이스 조회
+@router.get("/{task_id}")
+def get_trace(task_id: str, format: Literal["json", "otlp"] = "json"):
+    trace = tracing.get_trace(task_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.to_otlp() if format == "otlp" else trace.to_dict()
@@ -8,8 +8,53 @@ class Settings(BaseSettings):
     AI_BASE_URL: str = "http://localhost:5000" # AI 서버 기본 URL
     # TEST_AI_URL: str = "http://localhost:5001" # Mock AI 서버 테스트 URL
     AI_TIMEOUT_SEC: int = 100 # AI 서버 요청 타임아웃 (초)
+    AI_CONNECT_TIMEOUT_SEC: float = 10.0 # AI 서버 연결 타임아웃 (초)
+    AI_ANALYZE_TIMEOUT_SEC: float = 300.0 # /analyze 요청 타임아웃 (초)
+    AI_CONVERSATION_TIMEOUT_SEC: float = 300.0 # /conversation 요청 타임아웃 (초)
+    AI_CONVERSATION_STREAMING: bool = False # /conversation 스트리밍 모드 (부분 전사/토큰을 도착 즉시 전달)
+    AI_STREAM_IDLE_TIMEOUT_SEC: float = 60.0 # 스트리밍 응답 청크 사이 최대 대기 시간 (초)
+    AI_STREAM_MAX_LINE_BYTES: int = 8 * 1024 * 1024 # 스트리밍 결과 한 줄 최대 크기 (초과 라인은 건너뜀)
+
+    # AI 서버 HTTP 커넥션 풀 설정
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY_SEC: float = 30.0
+    AI_HTTP2: bool = False # HTTP/2 사용 여부 (h2 패키지 필요)
+
+    # 업로드 전 음성 변환 (WAV 파싱 -> 다운믹스 -> 리샘플링, 16비트 PCM WAV로 전송)
+    AI_AUDIO_PREPROCESS: bool = False # 음성 변환 사용 여부 (numpy 패키지 필요)
+    AI_ANALYZE_SAMPLE_RATE: int = 16000 # /analyze 업로드 샘플레이트 (0이면 변환 안 함)
+    AI_CONVERSATION_SAMPLE_RATE: int = 16000 # /conversation 업로드 샘플레이트 (0이면 변환 안 함)
+    AI_AUDIO_CHANNELS: int = 1 # 업로드 채널 수 (초과 채널은 평균으로 다운믹스)
 
     WORKER_URLS: str = "" # 콤마로 구분된 워커 URL 목록
+    AI_WORKER_MAX_CONCURRENCY: int = 8 # 워커별 동시 요청 수 상한
+    AI_WORKER_HEALTHCHECK_INTERVAL_SEC: float = 10.0 # 워커 헬스체크 주기 (초)
+    AI_WORKER_HEALTHCHECK_TIMEOUT_SEC: float = 2.0 # 워커 헬스체크 요청 타임아웃 (초, 초과 시 실패로 기록)
+    AI_WORKER_EJECT_AFTER_FAILURES: int = 2 # 연속 실패(헬스체크/요청) 시 서킷 open
+    AI_WORKER_PROBE_EWMA_ALPHA: float = 0.3 # 헬스 프로브 응답 시간 평활 계수
+    AI_CIRCUIT_OPEN_SEC: float = 30.0 # 서킷 open 유지 시간 (이후 half-open)
+    AI_CIRCUIT_HALF_OPEN_MAX_REQUESTS: int = 1 # half-open 상태에서 허용할 시험 요청 수
+    AI_ADAPTIVE_CONCURRENCY: bool = True # 응답 시간에 따라 AI 요청 동시성 한도 자동 조절 (AIMD)
+    AI_CONCURRENCY_MIN: int = 1 # 자동 조절 하한
+    AI_CONCURRENCY_MAX: int = 64 # 자동 조절 상한
+    AI_CONCURRENCY_LATENCY_TOLERANCE: float = 2.0 # 기준 응답 시간의 이 배수를 넘으면 한도 감소
+    AI_CONCURRENCY_BACKOFF_RATIO: float = 0.9 # 감소 시 곱하는 비율
+    AI_CONCURRENCY_RTT_WINDOW_SEC: float = 300.0 # 기준(최소) 응답 시간 재측정 주기
+    AI_RETRY_MAX_ATTEMPTS: int = 3 # 일시적 오류(연결 실패/타임아웃/429/502/503/504) 시 최대 시도 횟수
+    AI_RETRY_BASE_DELAY_SEC: float = 0.5 # 재시도 백오프 기준 시간 (full jitter 지수 백오프)
+    AI_RETRY_MAX_DELAY_SEC: float = 10.0 # 재시도 백오프 최대 시간
+    AI_RETRY_BUDGET_RATIO: float = 0.2 # 재시도/헤징 요청이 전체 요청에서 차지할 수 있는 비율
+    AI_RETRY_BUDGET_MIN_PER_SEC: float = 1.0 # 트래픽과 무관하게 초당 허용할 재시도 수
+    AI_HEDGE_CONVERSATION: bool = False # /conversation 응답이 늦으면 다른 워커로 같은 요청 추가 전송 (워커 2대 이상)
+    AI_HEDGE_PERCENTILE: float = 0.95 # 헤징 대기 시간 = 최근 응답 시간의 이 백분위
+    AI_HEDGE_MIN_DELAY_SEC: float = 1.0 # 헤징 대기 시간 하한
+    AI_HEDGE_MIN_SAMPLES: int = 20 # 헤징을 시작하기 위한 최소 응답 시간 표본 수
+    AI_BATCH_ENABLED: bool = False # 짧은 /analyze 작업을 모아서 배치 엔드포인트로 한 번에 전송 (AI 서버 배치 지원 필요)
+    AI_BATCH_ENDPOINT: str = "analyze/batch" # 배치 엔드포인트 경로
+    AI_BATCH_MAX_ITEMS: int = 4 # 배치 최대 작업 수 (차면 바로 전송, 큐별 동시 처리 한도 JOB_MAX_IN_FLIGHT를 넘으면 한도로 제한)
+    AI_BATCH_MAX_WAIT_MS: float = 20.0 # 첫 작업 이후 배치를 모으는 최대 대기 시간 (ms)
+    AI_BATCH_MAX_CLIP_SEC: float = 5.0 # 이 길이 이하의 음성만 배치 (길이를 모르면 단건 요청)
     
     # RabbitMQ 설정
     RABBITMQ_HOST: str  # .env
@@ -24,6 +69,7 @@ class Settings(BaseSettings):
     RABBITMQ_SOCKET_TIMEOUT_SEC: int = 10
     RABBITMQ_RECONNECT_INITIAL_DELAY_SEC: int = 1
     RABBITMQ_RECONNECT_MAX_DELAY_SEC: int = 30
+    RABBITMQ_TRANSPORT: str = "blocking"  # blocking: 스레드별 BlockingConnection / asyncio: 디스패처 루프 공유
     RABBITMQ_JOB_QUEUE: str = "ai.jobs"  # Consumer가 수신하는 큐
     RABBITMQ_CONVERSATION_JOB_QUEUE: str = "conversation.jobs"  # 대화 큐
     
@@ -33,6 +79,51 @@ class Settings(BaseSettings):
     RABBITMQ_LLM_QUEUE: str = "llm_result"
     RABBITMQ_ERROR_QUEUE: str = "error_result"
     RABBITMQ_CONVERSATION_QUEUE: str = "conversation_result"
+
+    # Producer 발행 파이프라인 설정 (publisher confirms)
+    PRODUCER_CONNECTIONS: int = 2  # 발행 전용 연결(I/O 스레드) 수
+    PRODUCER_MAX_UNCONFIRMED: int = 1000  # 연결별로 confirm 대기 가능한 메시지 수
+    PRODUCER_MAX_ATTEMPTS: int = 3  # 미확인(nack/연결 끊김) 메시지 재발행 횟수 상한
+    PRODUCER_CLOSE_TIMEOUT_SEC: float = 10.0  # 종료 시 미확인 메시지 대기 시간
+
+    # 작업 디스패치 설정
+    JOB_MAX_IN_FLIGHT: int = 5  # 큐별 동시 처리 작업 수 상한 (= RabbitMQ prefetch)
+    JOB_GLOBAL_MAX_IN_FLIGHT: int = 8  # 모든 큐 합산 동시 처리 작업 수 상한 (AI 워커로 가는 전체 예산)
+    JOB_AUDIO_WEIGHT: float = 1.0  # 전체 예산이 부족할 때 발음 분석 큐가 받는 몫의 가중치
+    JOB_CONVERSATION_WEIGHT: float = 3.0  # 대화 큐 가중치 (대화 턴 지연 시간 우선)
+    JOB_ACK_ON_COMPLETE: bool = True  # True: 결과 발행 후 ack / False: 수신 즉시 ack
+    JOB_SHORTEST_FIRST: bool = True  # 같은 큐/우선순위 안에서 음성 길이가 짧은 작업 먼저 시작 (WAV 헤더 기준)
+    JOB_COST_WAIT_RATIO: float = 1.0  # 음성 1초당 뒤에 도착한 짧은 작업에 양보하는 최대 대기 시간 (초, 기아 방지)
+    JOB_FIRST_RESULT_SLO_SEC: float = 10.0  # 메시지 수신 ~ 첫 결과 발행 목표 시간 (초과 시 경고 로그 + 메트릭)
+    PARSE_ERROR_PUBLISH_RATE_PER_SEC: float = 10.0  # 파싱 실패 에러 메시지 초당 발행 상한 (초과분은 집계만)
+    PARSE_ERROR_PUBLISH_BURST: int = 20
+
+    # 중복 전달(재전달) 처리 설정
+    DEDUP_ENABLED: bool = True  # 이미 완료된 taskId가 재전달되면 AI 재분석 없이 ack
+    DEDUP_TTL_SEC: float = 3600.0  # 완료 기록 보관 시간
+    DEDUP_MAX_ENTRIES: int = 10000  # 완료 기록 최대 개수 (LRU)
+    DEDUP_STORE_PATH: str = ""  # 지정 시 완료 기록을 디렉토리에 파일로 보관 (재시작 후에도 유지)
+    DEDUP_REPLAY_RESULTS: bool = False  # True: 중복 전달 시 캐시된 결과를 다시 발행 / False: ack만
+
+    # 분석 결과 캐시 설정 (동일 음성 파일 + 동일 analysisRequest)
+    ANALYSIS_CACHE_DIR: str = ""  # 지정 시 활성화, 결과를 이 디렉토리에 보관
+    ANALYSIS_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 캐시 디렉토리 최대 크기 (초과 시 LRU 삭제)
+
+    # 파일 I/O 설정
+    FILE_IO_THREADS: int = 8  # 공유 볼륨(NFS) 파일 열기/읽기/삭제 전용 스레드 수
+    FILE_VALIDATE_WAV: bool = True  # 처리 전 WAV 헤더 검증 (잘못된/잘린 파일은 업로드 없이 바로 실패 처리)
+    FILE_RETENTION_SEC: float = 300.0  # 작업 완료 후 파일을 남겨 두는 시간 (재전달된 작업이 파일을 찾을 수 있도록, 종료 시에는 바로 삭제)
+    FILE_DELETE_BATCH_SIZE: int = 100  # 한 번에 삭제할 최대 파일 수
+    FILE_DELETE_INTERVAL_SEC: float = 5.0  # 삭제 큐 확인 주기
+    FILE_DELETE_MAX_ATTEMPTS: int = 5  # 삭제 실패 시 최대 시도 횟수 (이후는 고아 파일 정리에 맡김)
+    FILE_ORPHAN_DIR: str = ""  # 고아 파일 정리 대상 디렉토리 (지정한 경우에만 정리, 이 디렉토리의 오래된 파일을 모두 삭제)
+    FILE_ORPHAN_MAX_AGE_HOURS: float = 24.0  # 이 시간보다 오래된 파일은 고아로 보고 삭제
+    FILE_ORPHAN_SWEEP_INTERVAL_SEC: float = 3600.0  # 고아 파일 정리 주기
+
+    # 작업 트레이싱 설정
+    TRACE_SAMPLE_RATE: float = 0.1  # 단계별 트레이스를 기록할 작업 비율 (0.0 ~ 1.0)
+    TRACE_BUFFER_SIZE: int = 200  # /v1/traces 에서 조회 가능한 최근 트레이스 수
+    TRACE_SLOW_JOB_MS: float = 60000.0  # 이 시간을 넘긴 샘플링 작업은 단계별 소요 시간을 경고 로그로 남김
     
     @property
     def worker_urls_list(self) -> list[str]:
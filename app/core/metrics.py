@@ -0,0 +1,208 @@
+# ai-gateway/app/core/metrics.py
+# Prometheus 텍스트 포맷 메트릭 (카운터 / 히스토그램 / 게이지) 레지스트리
+
+import threading
+from typing import Callable, Optional
+
+_registry: list["_Metric"] = []
+
+# 지연 시간(초) 히스토그램 기본 버킷
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    현재 값을 나타내는 게이지
+    set()으로 직접 설정하거나, set_function()으로 스크랩 시점에 값을 계산
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._function: Optional[Callable[[], dict]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], dict]):
+        """function: {라벨 값 튜플: 값} 딕셔너리를 반환하는 함수"""
+        self._function = function
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        if self._function is not None:
+            try:
+                items.extend(self._function().items())
+            except Exception:
+                pass
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple, list] = {}  # key -> [버킷별 카운트..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            for bound, count in zip(self.buckets, state):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+def render() -> str:
+    """등록된 모든 메트릭을 Prometheus 텍스트 포맷으로 출력"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# 작업 파이프라인 메트릭
+JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "gateway_job_queue_wait_seconds", "Time from message receive to a free dispatcher slot", ("queue",)
+)
+JOB_FIRST_RESULT_SECONDS = Histogram(
+    "gateway_job_first_result_seconds", "Time from message receive to first published result", ("queue",)
+)
+JOB_FIRST_RESULT_SLO_MISSES_TOTAL = Counter(
+    "gateway_job_first_result_slo_misses_total", "Jobs whose first result missed JOB_FIRST_RESULT_SLO_SEC", ("queue",)
+)
+JOB_DURATION_SECONDS = Histogram(
+    "gateway_job_duration_seconds", "Time from message receive to job completion", ("queue",)
+)
+JOB_RESULT_LINES = Histogram(
+    "gateway_job_result_lines", "NDJSON result lines per job by result type", ("type",), buckets=COUNT_BUCKETS
+)
+ACTIVE_JOBS = Gauge("gateway_active_jobs", "Jobs currently running per consumer queue", ("queue",))
+WAITING_JOBS = Gauge("gateway_waiting_jobs", "Received jobs waiting for a dispatcher slot per queue", ("queue",))
+PARSE_ERRORS_TOTAL = Counter("gateway_parse_errors_total", "Malformed job messages", ("queue", "kind"))
+DUPLICATE_DELIVERIES_TOTAL = Counter(
+    "gateway_duplicate_deliveries_total", "Redelivered jobs settled without re-analysis", ("queue", "state")
+)
+
+# AI 서버 요청 메트릭
+AI_REQUEST_SECONDS = Histogram(
+    "gateway_ai_request_seconds", "AI server request duration", ("endpoint", "worker", "outcome")
+)
+ANALYSIS_CACHE_TOTAL = Counter(
+    "gateway_analysis_cache_total", "Analysis cache lookups by endpoint and outcome", ("endpoint", "outcome")
+)
+NDJSON_SKIPPED_LINES_TOTAL = Counter(
+    "gateway_ndjson_skipped_lines_total", "Streamed AI result lines dropped by the NDJSON parser", ("reason",)
+)
+AI_RETRIES_TOTAL = Counter(
+    "gateway_ai_retries_total", "AI request retries by endpoint and outcome", ("endpoint", "outcome")
+)
+AI_HEDGES_TOTAL = Counter("gateway_ai_hedges_total", "Hedged AI requests by winning request", ("endpoint", "winner"))
+AI_BATCH_SIZE = Histogram(
+    "gateway_ai_batch_size", "Jobs per micro-batched AI request", ("endpoint",), buckets=COUNT_BUCKETS
+)
+AI_CONCURRENCY_LIMIT = Gauge("gateway_ai_concurrency_limit", "Adaptive concurrency limit toward the AI workers")
+AI_WORKER_IN_FLIGHT = Gauge("gateway_ai_worker_in_flight", "In-flight requests per AI worker", ("worker",))
+
+# 결과 발행 메트릭
+PUBLISH_CONFIRM_SECONDS = Histogram(
+    "gateway_publish_confirm_seconds", "Time from publish to broker confirm per result queue", ("queue",)
+)
+PUBLISH_FAILURES_TOTAL = Counter(
+    "gateway_publish_failures_total", "Results dropped after exhausting publish attempts", ("queue",)
+)
+
+# 파일 I/O 메트릭
+FILE_READ_BYTES = Histogram("gateway_file_read_bytes", "Size of audio files sent to the AI server", buckets=SIZE_BUCKETS)
+FILE_OPEN_SECONDS = Histogram("gateway_file_open_seconds", "Time to open and stat audio files")
+FILE_READ_SECONDS = Histogram(
+    "gateway_file_read_seconds", "Time spent reading an audio file while uploading it, including file I/O pool waits"
+)
+FILE_DELETIONS_TOTAL = Counter(
+    "gateway_file_deletions_total", "Processed audio file deletions by outcome", ("outcome",)
+)
+FILES_PENDING_DELETION = Gauge("gateway_files_pending_deletion", "Processed audio files waiting in the deletion queue")
+AUDIO_PREPROCESS_TOTAL = Counter(
+    "gateway_audio_preprocess_total", "Audio pre-processing before upload by endpoint and outcome", ("endpoint", "outcome")
+)
+AUDIO_PREPROCESS_SECONDS = Histogram(
+    "gateway_audio_preprocess_seconds", "Time to downmix/resample audio before upload", ("endpoint",)
+)
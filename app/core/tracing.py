@@ -0,0 +1,217 @@
+# ai-gateway/app/core/tracing.py
+# 작업(taskId) 단위 단계별 트레이싱 (샘플링, JSON / OTLP 호환 내보내기, 프로파일링 훅)
+
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = ("span_id", "name", "start_ns", "end_ns", "attributes", "events")
+
+    def __init__(self, name: str, start_ns: int, attributes: Optional[dict] = None):
+        self.span_id = os.urandom(8).hex()
+        self.name = name
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.events: list[tuple[str, int, dict]] = []
+
+    def add_event(self, name: str, **attributes):
+        self.events.append((name, time.time_ns(), attributes))
+
+    def to_dict(self) -> dict:
+        end_ns = self.end_ns or self.start_ns
+        return {
+            "spanId": self.span_id,
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "durationMs": (end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "events": [
+                {"name": name, "offsetMs": (ts - self.start_ns) / 1e6, "attributes": attrs}
+                for name, ts, attrs in self.events
+            ],
+        }
+
+
+class Trace:
+    """
+    작업 하나의 단계별 span 모음
+    (디스패처 루프와 pika I/O 스레드 양쪽에서 span이 추가될 수 있음)
+    """
+
+    def __init__(self, task_id: str, queue_name: str):
+        self.trace_id = os.urandom(16).hex()
+        self.root_span_id = os.urandom(8).hex()
+        self.task_id = task_id
+        self.queue_name = queue_name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.spans: list[Span] = []
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, **attributes) -> Span:
+        span = Span(name, start_ns, attributes)
+        span.end_ns = end_ns
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        span = Span(name, time.time_ns(), attributes)
+        try:
+            yield span
+        except Exception as e:
+            span.attributes["error"] = str(e)
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start_ns)
+        return {
+            "traceId": self.trace_id,
+            "taskId": self.task_id,
+            "queue": self.queue_name,
+            "start": self.start_ns / 1e9,
+            "durationMs": self.duration_ms,
+            "error": self.error,
+            "spans": [s.to_dict() for s in spans],
+        }
+
+    def to_otlp(self) -> dict:
+        """OpenTelemetry OTLP/JSON (ExportTraceServiceRequest) 형식으로 변환"""
+
+        def attrs(values: dict) -> list[dict]:
+            return [{"key": k, "value": {"stringValue": str(v)}} for k, v in values.items()]
+
+        root_id = self.root_span_id
+        root = {
+            "traceId": self.trace_id,
+            "spanId": root_id,
+            "name": f"job {self.queue_name}",
+            "kind": 5,  # SPAN_KIND_CONSUMER
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": attrs({"taskId": self.task_id, "messaging.destination": self.queue_name}),
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        with self._lock:
+            spans = list(self.spans)
+        children = [
+            {
+                "traceId": self.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": root_id,
+                "name": s.name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or s.start_ns),
+                "attributes": attrs(s.attributes),
+                "status": {"code": 2, "message": str(s.attributes["error"])} if "error" in s.attributes else {},
+                "events": [
+                    {"name": name, "timeUnixNano": str(ts), "attributes": attrs(a)} for name, ts, a in s.events
+                ],
+            }
+            for s in spans
+        ]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": attrs({"service.name": "ai-gateway"})},
+                    "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": [root] + children}],
+                }
+            ]
+        }
+
+
+# 현재 작업의 Trace (샘플링되지 않은 작업이면 None)
+current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+_recent: "OrderedDict[str, Trace]" = OrderedDict()
+_recent_lock = threading.Lock()
+_hooks: list[Callable[[Trace], None]] = []
+
+
+def add_hook(hook: Callable[[Trace], None]):
+    """
+    작업 종료 시 호출될 프로파일링 훅 등록 (예: 외부 수집기로 전송)
+    """
+    _hooks.append(hook)
+
+
+def start_trace(task_id: str, queue_name: str) -> Optional[Trace]:
+    """
+    샘플링 비율(TRACE_SAMPLE_RATE)에 따라 Trace 생성
+    """
+    if random.random() >= settings.TRACE_SAMPLE_RATE:
+        return None
+    return Trace(task_id, queue_name)
+
+
+def finish_trace(trace: Trace):
+    trace.end_ns = time.time_ns()
+    with _recent_lock:
+        _recent[trace.task_id] = trace
+        _recent.move_to_end(trace.task_id)
+        while len(_recent) > settings.TRACE_BUFFER_SIZE:
+            _recent.popitem(last=False)
+    for hook in _hooks:
+        try:
+            hook(trace)
+        except Exception as e:
+            logger.error(f"트레이스 훅 실패: {e}")
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    현재 작업의 Trace에 span 기록 (트레이스가 없으면 아무것도 하지 않음)
+    """
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attributes) as s:
+        yield s
+
+
+def recent_traces(limit: int = 50) -> list[Trace]:
+    with _recent_lock:
+        traces = list(_recent.values())
+    return traces[-limit:][::-1]
+
+
+def get_trace(task_id: str) -> Optional[Trace]:
+    with _recent_lock:
+        return _recent.get(task_id)
+
+
+def _log_slow_job(trace: Trace):
+    if trace.duration_ms < settings.TRACE_SLOW_JOB_MS:
+        return
+    stages = ", ".join(f"{s['name']}={s['durationMs']:.1f}ms" for s in trace.to_dict()["spans"])
+    logger.warning(f"느린 작업: taskId={trace.task_id}, total={trace.duration_ms:.1f}ms, {stages}")
+
+
+add_hook(_log_slow_job)
@@ -1,16 +1,26 @@
 # ai-gateway/app/main.py
 # FASTAPI application 엔트리 포인트
 
+import asyncio
 import threading
 import logging
+from collections import Counter
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from app.api.v1.routes import router as v1_router
+from app.core import metrics, tracing
+from app.core.config import settings
 from app.messaging.consumer import AudioJobConsumer, ConversationJobConsumer
+from app.messaging.dedup import TaskResultCache
+from app.messaging.dispatcher import JobDispatcher, current_job
 from app.messaging.producer import AudioResultProducer
 from app.api.v1.clients import ai_client
-from app.services.file_service import FileService
+from app.api.v1.clients.concurrency import ai_limiter
+from app.api.v1.clients.worker_pool import request_cost, worker_pool
+from app.services.analysis_cache import AnalysisCache
+from app.services.file_cleaner import file_cleaner
+from app.services.file_service import FileService, run_io, shutdown_io_executor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,8 +31,69 @@ consumer_thread: threading.Thread = None
 conversation_consumer: ConversationJobConsumer = None
 conversation_consumer_thread: threading.Thread = None
 
+dispatcher: JobDispatcher = None
 producer: AudioResultProducer = None
 file_service: FileService = None
+analysis_cache: AnalysisCache = None
+
+
+async def _cache_lookup(file_path: str, endpoint: str, analysis_request: dict):
+    """
+    분석 캐시 조회 (파일 해시 계산 포함, 블로킹 I/O는 파일 I/O 스레드 풀에서 실행)
+
+    Returns:
+        (캐시 키, 캐시된 결과 라인 목록) - 캐시 비활성화/조회 실패 시 키는 None, 미적중 시 라인은 None
+    """
+    if analysis_cache is None:
+        return None, None
+    try:
+        with tracing.span("cache.lookup", endpoint=endpoint):
+            key = await run_io(AnalysisCache.make_key, file_path, endpoint, analysis_request)
+            lines = await run_io(analysis_cache.get, key)
+    except Exception as e:
+        logger.warning(f"분석 캐시 조회 실패: {file_path}, error: {e}")
+        return None, None
+    metrics.ANALYSIS_CACHE_TOTAL.inc(endpoint=endpoint, outcome="miss" if lines is None else "hit")
+    return key, lines
+
+
+async def _cache_store(key: str, results: list[dict]):
+    # 실패 결과가 섞여 있으면 캐시하지 않음 (다음 요청에서 재분석)
+    if not results or any(r.get("status", "SUCCESS") != "SUCCESS" for r in results):
+        return
+    await run_io(analysis_cache.put, key, results)
+
+
+def _with_task_id(line: dict, task_id: str) -> dict:
+    # 캐시된 결과 라인의 taskId를 현재 작업의 것으로 교체
+    return {**line, "taskId": task_id} if "taskId" in line else line
+
+
+async def _replay(lines: list[dict], task_id: str):
+    for line in lines:
+        yield _with_task_id(line, task_id)
+
+
+async def estimate_job_cost(file_path: str, task_id: str, analysis_request: dict) -> float:
+    """
+    디스패처 짧은 작업 우선 스케줄링용 비용 추정 (WAV 헤더 기준 음성 길이, 초)
+    """
+    audio = await FileService.probe_wav_async(file_path)
+    return audio.duration_sec
+
+
+async def _validate_audio(file_path: str):
+    """
+    WAV 헤더 검증 (잘못된/잘린 파일은 업로드 없이 바로 실패) 및 워커 부하 추정치 설정
+    디스패처가 이미 헤더를 읽어 비용을 추정했으면 다시 읽지 않음
+    """
+    job = current_job.get()
+    cost = job.cost if job else 0.0
+    if settings.FILE_VALIDATE_WAV and not cost:
+        audio = await FileService.probe_wav_async(file_path)
+        logger.info(f"음성 파일 확인: {file_path} ({audio.duration_sec:.1f}s, {audio.sample_rate}Hz, {audio.channels}ch)")
+        cost = audio.duration_sec
+    request_cost.set(cost)
 
 
 async def process_audio_job(file_path: str, task_id: str, analysis_request: dict):
@@ -33,29 +104,51 @@ async def process_audio_job(file_path: str, task_id: str, analysis_request: dict
         file_path: 처리할 파일 경로
         task_id: 작업 ID
         analysis_request: 분석 요청 데이터
+
+    Returns:
+        발행한 결과 목록 [(result_type, data), ...] (재전달 시 재사용)
     """
     try:
         logger.info(f"파일 처리 시작: {file_path}")
+        await _validate_audio(file_path)
         
         # 1. AI 서버로 분석 요청 및 결과 수신
-        async for result in ai_client.analyze_audio(file_path, task_id, analysis_request):
+        # 결과는 도착 즉시 발행하고, broker confirm은 작업 종료 전에 한 번에 대기
+        job = current_job.get()
+        confirms = []
+        published = []
+        line_counts = Counter()
+        cache_key, cached = await _cache_lookup(file_path, "analyze", analysis_request)
+        if cached is not None:
+            logger.info(f"분석 캐시 적중: {file_path}, taskId={task_id}")
+            results = _replay(cached, task_id)
+        else:
+            results = ai_client.analyze_audio(file_path, task_id, analysis_request)
+        async for result in results:
             result_type = result.get("type")
 
             if result_type:
-                producer.publish(
+                confirms.append(asyncio.wrap_future(producer.publish(
                     result_type=result_type,
                     data=result
-                )
+                )))
+                published.append((result_type, result))
+                line_counts[result_type] += 1
+                if job:
+                    job.mark_result()
             else:
                 logger.warning(f"결과 타입 누락: {result}")
-        # 3. 파일 삭제
-        deleted = file_service.delete_file(file_path)
-        if deleted:
-            logger.info(f"파일 삭제 완료: {file_path}")
-        else:
-            logger.warning(f"파일 삭제 실패: {file_path}")
+        await asyncio.gather(*confirms)
+        for result_type, count in line_counts.items():
+            metrics.JOB_RESULT_LINES.observe(count, type=result_type)
+        if cache_key is not None and cached is None:
+            await _cache_store(cache_key, [result for _, result in published])
+
+        # 3. 파일 삭제 예약 (보관 시간이 지나면 백그라운드에서 일괄 삭제)
+        file_cleaner.schedule(file_path)
         
         logger.info(f"파일 처리 완료: {file_path}")
+        return published
         
     except Exception as e:
         logger.error(f"파일 처리 실패: {file_path}, error: {e}")
@@ -69,12 +162,60 @@ async def process_audio_job(file_path: str, task_id: str, analysis_request: dict
         }
         
         try:
-            producer.publish(
+            await producer.publish_async(
                 result_type="error",
                 data=error_message
             )
         except Exception as pub_error:
             logger.error(f"에러 메시지 발행 실패: {pub_error}")
+            raise  # 결과 발행 실패 시 ack 하지 않고 재전달 대기
+        file_cleaner.schedule(file_path)  # 실패한 작업의 파일도 보관 시간 후 삭제
+        return [("error", error_message)]
+
+async def _stream_conversation(file_path: str, task_id: str, analysis_request: dict):
+    """
+    대화 스트리밍 모드: 부분 전사 / 응답 토큰 청크를 도착 즉시 conversation 큐로 전달
+    (청크에는 event, seq 필드가 붙고, 같은 taskId의 청크는 같은 연결로 순서대로 발행)
+
+    Returns:
+        최종 결과 (AI 서버가 final 청크를 보내지 않으면 청크를 모아서 생성)
+    """
+    job = current_job.get()
+    confirms = []
+    transcript = None
+    tokens = []
+    final = None
+    seq = 0
+    async for chunk in ai_client.conversation_stream(file_path, task_id, analysis_request):
+        event = chunk.get("event")
+        if event == "final":
+            final = {k: v for k, v in chunk.items() if k != "event"}
+            continue
+        if event == "transcript":
+            transcript = chunk.get("text")
+        elif event == "token":
+            tokens.append(chunk.get("delta") or "")
+
+        seq += 1
+        confirms.append(asyncio.wrap_future(producer.publish(
+            result_type="conversation",
+            data={**chunk, "taskId": task_id, "seq": seq},
+            ordering_key=task_id,
+        )))
+        if job:
+            job.mark_result()
+    # 최종 결과는 모든 부분 청크가 confirm된 뒤에 발행
+    await asyncio.gather(*confirms)
+
+    if final is None and (transcript is not None or tokens):
+        final = {
+            "taskId": task_id,
+            "status": "SUCCESS",
+            "error": None,
+            "analysisResult": {"transcript": transcript, "reply": "".join(tokens)},
+        }
+    return final
+
 
 # 회화 기능
 async def process_conversation_job(file_path: str, task_id: str, analysis_request: dict):
@@ -85,27 +226,43 @@ async def process_conversation_job(file_path: str, task_id: str, analysis_reques
         file_path: 처리할 파일 경로
         task_id: 작업 ID
         analysis_request: 분석 요청 데이터
+
+    Returns:
+        발행한 결과 목록 [(result_type, data), ...] (재전달 시 재사용)
     """
     try:
         logger.info(f"파일 처리 시작: {file_path}")
+        await _validate_audio(file_path)
+        published = []
         
-        # 1. AI 서버로 분석 요청 및 결과 수신
-        result = await ai_client.conversation_audio(file_path, task_id, analysis_request)
+        # 1. AI 서버로 분석 요청 및 결과 수신 (동일 파일 + 동일 요청이면 캐시 결과 사용)
+        cache_key, cached = await _cache_lookup(file_path, "conversation", analysis_request)
+        if cached:
+            logger.info(f"대화 분석 캐시 적중: {file_path}, taskId={task_id}")
+            result = _with_task_id(cached[0], task_id)
+        else:
+            if settings.AI_CONVERSATION_STREAMING:
+                result = await _stream_conversation(file_path, task_id, analysis_request)
+            else:
+                result = await ai_client.conversation_audio(file_path, task_id, analysis_request)
+            if cache_key is not None and result:
+                await _cache_store(cache_key, [result])
         if result:
-            producer.publish(
+            await producer.publish_async(
                 result_type="conversation",
                 data=result
             )
+            published.append(("conversation", result))
+            job = current_job.get()
+            if job:
+                job.mark_result()
         else:
             logger.warning(f"결과 타입 누락: {result}")
-        # 3. 파일 삭제
-        deleted = file_service.delete_file(file_path)
-        if deleted:
-            logger.info(f"파일 삭제 완료: {file_path}")
-        else:
-            logger.warning(f"파일 삭제 실패: {file_path}")
+        # 3. 파일 삭제 예약 (보관 시간이 지나면 백그라운드에서 일괄 삭제)
+        file_cleaner.schedule(file_path)
         
         logger.info(f"파일 처리 완료: {file_path}")
+        return published
         
     except Exception as e:
         logger.error(f"파일 처리 실패: {file_path}, error: {e}")
@@ -119,38 +276,91 @@ async def process_conversation_job(file_path: str, task_id: str, analysis_reques
         }
         
         try:
-            producer.publish(
+            await producer.publish_async(
                 result_type="error",
                 data=error_message
             )
         except Exception as pub_error:
             logger.error(f"에러 메시지 발행 실패: {pub_error}")
+            raise  # 결과 발행 실패 시 ack 하지 않고 재전달 대기
+        file_cleaner.schedule(file_path)  # 실패한 작업의 파일도 보관 시간 후 삭제
+        return [("error", error_message)]
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """FastAPI 앱 생명주기 관리 - startup/shutdown 이벤트"""
-    global consumer, consumer_thread, producer, file_service, conversation_consumer, conversation_consumer_thread
+    global consumer, consumer_thread, producer, file_service, conversation_consumer, conversation_consumer_thread, dispatcher, analysis_cache
     
     # Startup
     logger.info("FastAPI application starting...")
     
     try:
-        # Producer 및 FileService 초기화
-        producer = AudioResultProducer()
+        # 작업 디스패처 초기화 (모든 작업이 공유하는 단일 이벤트 루프 + 큐 가중치 기반 공유 동시성 예산)
+        # 짧은 작업 우선: 작업마다 WAV 헤더로 음성 길이를 추정해 같은 우선순위 안에서 짧은 작업 먼저 시작
+        dispatcher = JobDispatcher(cost_estimator=estimate_job_cost if settings.JOB_SHORTEST_FIRST else None)
+        dispatcher.start()
+        use_asyncio_transport = settings.RABBITMQ_TRANSPORT == "asyncio"
+
+        # Producer 및 FileService 초기화 (asyncio 전송이면 디스패처 루프 위에서 발행)
+        producer = AudioResultProducer(loop=dispatcher.loop if use_asyncio_transport else None)
+        await asyncio.to_thread(producer.connect)
         file_service = FileService()
+        analysis_cache = AnalysisCache.from_settings()
+
+        # AI 서버 HTTP 클라이언트 초기화 (API 루프 / 디스패처 루프 각각 커넥션 풀 보유)
+        ai_client.get_client()
+        await asyncio.wrap_future(dispatcher.call(ai_client.open_client))
+
+        # AI 워커 헬스체크 시작 (실패한 워커는 라우팅에서 제외)
+        await asyncio.wrap_future(dispatcher.call(worker_pool.start_health_checks))
+
+        # 처리 완료 파일 삭제 큐 / 고아 파일 정리 시작
+        await asyncio.wrap_future(dispatcher.call(file_cleaner.start))
         
-        # Consumer 초기화 (콜백 함수 전달)
-        consumer = AudioJobConsumer(process_callback=process_audio_job)
-        consumer_thread = threading.Thread(target=consumer.start, daemon=True)
-        consumer_thread.start()
-        logger.info("RabbitMQ consumer thread started")
-
-        # === 아래 추가 ===
-        conversation_consumer = ConversationJobConsumer(process_callback=process_conversation_job)
-        conversation_consumer_thread = threading.Thread(target=conversation_consumer.start, daemon=True)
-        conversation_consumer_thread.start()
-        logger.info("RabbitMQ conversation consumer thread started")
+        # Consumer 초기화 (콜백 함수 전달, 재전달된 작업은 완료 기록으로 중복 분석 방지)
+        result_cache = TaskResultCache.from_settings()
+        if result_cache is not None:
+            await run_io(result_cache.load_store)  # 재시작 전 완료 기록 (DEDUP_STORE_PATH 지정 시)
+        consumer = AudioJobConsumer(
+            process_callback=process_audio_job,
+            dispatcher=dispatcher,
+            producer=producer,
+            result_cache=result_cache,
+        )
+        conversation_consumer = ConversationJobConsumer(
+            process_callback=process_conversation_job,
+            dispatcher=dispatcher,
+            producer=producer,
+            result_cache=result_cache,
+        )
+
+        if use_asyncio_transport:
+            # 메시지 수신 / AI 서버 호출 / 결과 발행 모두 디스패처 이벤트 루프 하나에서 실행
+            dispatcher.call(consumer.consume_async)
+            dispatcher.call(conversation_consumer.consume_async)
+            logger.info("RabbitMQ consumers started on dispatcher loop (asyncio transport)")
+        else:
+            consumer_thread = threading.Thread(target=consumer.start, daemon=True)
+            consumer_thread.start()
+            logger.info("RabbitMQ consumer thread started")
+
+            conversation_consumer_thread = threading.Thread(target=conversation_consumer.start, daemon=True)
+            conversation_consumer_thread.start()
+            logger.info("RabbitMQ conversation consumer thread started")
+
+        # 모든 AI 워커의 서킷이 열리면 메시지 수신을 일시 정지하고, 복구되면 재개
+        worker_pool.add_listener(consumer.on_workers_available)
+        worker_pool.add_listener(conversation_consumer.on_workers_available)
+
+        # AI 응답 시간으로 조절된 동시성 한도를 디스패처 예산, Consumer prefetch, 배치 크기에 반영
+        def apply_concurrency_limit(limit: int):
+            dispatcher.resize(limit)
+            consumer.set_prefetch(dispatcher.max_in_flight)
+            conversation_consumer.set_prefetch(dispatcher.max_in_flight)
+            ai_client.analyze_batcher.set_limit(dispatcher.max_in_flight)
+
+        ai_limiter.add_listener(apply_concurrency_limit)
 
     except Exception as e:
         logger.error(f"Failed to start consumer: {e}")
@@ -172,12 +382,30 @@ async def lifespan(app: FastAPI):
             logger.info("Conversation consumer stopped successfully")
         except Exception as e:
             logger.error(f"Failed to stop conversation consumer: {e}")
+    # asyncio 전송이면 Producer가 디스패처 루프를 사용하므로 디스패처보다 먼저 종료
     if producer:
         try:
-            producer.close()
+            await asyncio.to_thread(producer.close)
             logger.info("Producer closed successfully")
         except Exception as e:
             logger.error(f"Failed to close producer: {e}")
+    if dispatcher:
+        try:
+            await asyncio.wrap_future(dispatcher.call(worker_pool.stop_health_checks))
+            await asyncio.wrap_future(dispatcher.call(file_cleaner.stop))
+            await asyncio.wait_for(asyncio.wrap_future(dispatcher.call(ai_client.close_client)), timeout=10)
+            dispatcher.stop()
+            logger.info("Dispatcher stopped successfully")
+        except Exception as e:
+            logger.error(f"Failed to stop dispatcher: {e}")
+    try:
+        await ai_client.close_client()
+    except Exception as e:
+        logger.error(f"Failed to close AI client: {e}")
+    try:
+        await asyncio.to_thread(shutdown_io_executor)
+    except Exception as e:
+        logger.error(f"Failed to shut down file I/O executor: {e}")
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -1,19 +1,74 @@
 ﻿import asyncio
-import json
+import functools
 import logging
 import threading
 import time
+from collections import Counter
+from concurrent.futures import Future
 from typing import Optional
 
+from app.core import metrics, tracing
 from app.core.config import settings
-from app.messaging.rabbitmq import RabbitMQConnection
-from app.messaging.schemas import AudioJobMessage
+from app.messaging.decoding import MessageDecodeError, decode_job
+from app.messaging.dedup import TaskResultCache
+from app.messaging.dispatcher import JobDispatcher
+from app.messaging.producer import AudioResultProducer
+from app.messaging.rabbitmq import RabbitMQConnection, call_threadsafe
 
 logger = logging.getLogger(__name__)
 
 
+class _RateLimiter:
+    """Token bucket; only used from the consumer's pika I/O thread."""
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate_per_sec)
+        self._updated_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+def _gather(futures: list[Future]) -> Future:
+    """Future resolved once all `futures` are done, failing with the first error."""
+    combined: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(future: Future):
+        with lock:
+            remaining[0] -= 1
+            if combined.done():
+                return
+            if future.cancelled():
+                combined.cancel()
+            elif future.exception() is not None:
+                combined.set_exception(future.exception())
+            elif remaining[0] == 0:
+                combined.set_result(None)
+
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+
 class BaseJobConsumer:
-    def __init__(self, queue_name: str, process_callback=None):
+    def __init__(
+        self,
+        queue_name: str,
+        process_callback=None,
+        dispatcher: Optional[JobDispatcher] = None,
+        producer: Optional[AudioResultProducer] = None,
+        result_cache: Optional[TaskResultCache] = None,
+    ):
         self.rabbitmq = RabbitMQConnection(
             host=settings.RABBITMQ_HOST,
             port=settings.RABBITMQ_PORT,
@@ -28,7 +83,20 @@ class BaseJobConsumer:
         )
         self.queue_name = queue_name
         self.process_callback = process_callback
+        self.dispatcher = dispatcher
+        self.producer = producer
+        self.result_cache = result_cache
+        self._running: dict[str, Future] = {}  # taskId -> job future, for redeliveries of running jobs
+        self.parse_errors: Counter = Counter()
+        self._parse_error_limiter = _RateLimiter(
+            settings.PARSE_ERROR_PUBLISH_RATE_PER_SEC, settings.PARSE_ERROR_PUBLISH_BURST
+        )
         self._stop_requested = False
+        self._paused = False
+        self._consumer_tag: Optional[str] = None
+        self.prefetch_count = settings.JOB_MAX_IN_FLIGHT
+        self._async_transport = False
+        self._async_opened = False
 
     def start(self):
         reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
@@ -37,15 +105,21 @@ class BaseJobConsumer:
         while not self._stop_requested:
             try:
                 self.rabbitmq.connect()
-                self.rabbitmq.channel.basic_qos(prefetch_count=5)
-                self.rabbitmq.channel.basic_consume(
-                    queue=self.queue_name,
-                    on_message_callback=self._on_message,
-                    auto_ack=False,
-                )
-                logger.info("Consumer started: queue=%s", self.queue_name)
+                self.rabbitmq.channel.basic_qos(prefetch_count=self.prefetch_count)
                 reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
-                self.rabbitmq.channel.start_consuming()
+                while not self._stop_requested:
+                    if self._paused:
+                        # Keep heartbeats and pending acks flowing while no consumer is registered
+                        self.rabbitmq.connection.process_data_events(time_limit=1)
+                        continue
+                    self._consumer_tag = self.rabbitmq.channel.basic_consume(
+                        queue=self.queue_name,
+                        on_message_callback=self._on_message,
+                        auto_ack=False,
+                    )
+                    logger.info("Consumer started: queue=%s", self.queue_name)
+                    self.rabbitmq.channel.start_consuming()
+                    self._consumer_tag = None
             except KeyboardInterrupt:
                 logger.info("Consumer stop requested by keyboard interrupt")
                 self.stop()
@@ -59,50 +133,215 @@ class BaseJobConsumer:
             finally:
                 self.rabbitmq.close()
 
+    async def consume_async(self):
+        """Consume on the running event loop with pika's asyncio adapter (RABBITMQ_TRANSPORT=asyncio)."""
+        self._async_transport = True
+        loop = asyncio.get_running_loop()
+        reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+        max_reconnect_delay = settings.RABBITMQ_RECONNECT_MAX_DELAY_SEC
+
+        while not self._stop_requested:
+            closed = loop.create_future()
+
+            def finish(connection, reason):
+                if not closed.done():
+                    closed.set_result(reason)
+
+            self._async_opened = False
+            self.rabbitmq.connect_asyncio(
+                on_open=self._on_async_connection_open,
+                on_open_error=finish,
+                on_close=finish,
+                loop=loop,
+            )
+            reason = await closed
+            self.rabbitmq.channel = None
+            self._consumer_tag = None
+            if self._stop_requested:
+                break
+            if self._async_opened:
+                reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+            logger.error("Consumer connection error (queue=%s): %r", self.queue_name, reason)
+            logger.info("Reconnecting queue=%s in %ss", self.queue_name, reconnect_delay)
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
+
+    def _on_async_connection_open(self, connection):
+        self._async_opened = True
+        logger.info("RabbitMQ connected: %s:%s", self.rabbitmq.host, self.rabbitmq.port)
+        connection.channel(on_open_callback=self._on_async_channel_open)
+
+    def _on_async_channel_open(self, channel):
+        self.rabbitmq.channel = channel
+        channel.add_on_close_callback(self._on_async_channel_closed)
+        channel.basic_qos(
+            prefetch_count=self.prefetch_count,
+            callback=lambda _frame: self._basic_consume(),
+        )
+
+    def _on_async_channel_closed(self, channel, reason):
+        logger.warning("Consumer channel closed (queue=%s): %s", self.queue_name, reason)
+        connection = self.rabbitmq.connection
+        if connection and connection.is_open:
+            connection.close()
+
+    def _basic_consume(self):
+        channel = self.rabbitmq.channel
+        if self._paused or self._consumer_tag or not channel or not channel.is_open:
+            return
+        self._consumer_tag = channel.basic_consume(
+            queue=self.queue_name,
+            on_message_callback=self._on_message,
+            auto_ack=False,
+        )
+        logger.info("Consumer started: queue=%s", self.queue_name)
+
     def _on_message(self, channel, method, properties, body):
         task_id: Optional[str] = None
         try:
-            message_dict = json.loads(body)
-            task_id = message_dict.get("taskId") or message_dict.get("task_id")
-            message = AudioJobMessage(**message_dict)
+            received_ns = time.time_ns()
+            message = decode_job(body)
+            decoded_ns = time.time_ns()
+            task_id = message.taskId
             file_path = message.filePath
             logger.info("Message received: queue=%s file=%s", self.queue_name, file_path)
 
-            if self.process_callback:
-                threading.Thread(
-                    target=self._process_in_thread,
-                    args=(file_path, message.taskId, message.analysisRequest),
-                    daemon=True,
-                ).start()
+            trace = tracing.start_trace(message.taskId, self.queue_name)
+            if trace is not None:
+                trace.start_ns = received_ns
+                trace.add_span("decode", received_ns, decoded_ns, bytes=len(body))
+
+            if self._settle_duplicate(channel, method.delivery_tag, message.taskId):
+                return
+
+            if self.process_callback and self.dispatcher:
+                future = self.dispatcher.submit(
+                    self.queue_name,
+                    self.process_callback,
+                    file_path,
+                    message.taskId,
+                    message.analysisRequest,
+                    priority=properties.priority or 0,
+                    trace=trace,
+                )
+                self._running[message.taskId] = future
+                future.add_done_callback(functools.partial(self._on_task_finished, message.taskId))
+                if settings.JOB_ACK_ON_COMPLETE:
+                    # Settle from the pika I/O thread once the job's results are published
+                    future.add_done_callback(
+                        functools.partial(
+                            self._on_job_done,
+                            self.rabbitmq.connection,
+                            channel,
+                            method.delivery_tag,
+                            message.taskId,
+                        )
+                    )
+                    return
             else:
-                logger.warning("Process callback is not configured")
+                logger.warning("Process callback or dispatcher is not configured")
                 channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
                 return
 
             channel.basic_ack(delivery_tag=method.delivery_tag)
             logger.info("Message acked: queue=%s task_id=%s", self.queue_name, message.taskId)
 
-        except json.JSONDecodeError as e:
-            logger.error("JSON parse error: %s", e)
-            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
-            if task_id:
-                self._publish_parse_error(task_id, str(e))
+        except MessageDecodeError as e:
+            if e.kind == "json":
+                logger.error("JSON parse error: %s", e)
+                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            else:
+                logger.error("Message handling error: %s", e)
+                channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            self._publish_parse_error(e.task_id, str(e), e.kind)
         except Exception as e:
             logger.error("Message handling error: %s", e)
             channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
-            if task_id:
-                self._publish_parse_error(task_id, str(e))
+            self._publish_parse_error(task_id, str(e), type(e).__name__)
+
+    def _settle_duplicate(self, channel, delivery_tag: int, task_id: str) -> bool:
+        """Settle a redelivered task without re-running it; returns False for new tasks."""
+        running = self._running.get(task_id)
+        if running is not None:
+            metrics.DUPLICATE_DELIVERIES_TOTAL.inc(queue=self.queue_name, state="running")
+            logger.info("Duplicate delivery of running task: queue=%s task_id=%s", self.queue_name, task_id)
+            if settings.JOB_ACK_ON_COMPLETE:
+                # Settle the new delivery the same way the original job is settled
+                running.add_done_callback(
+                    functools.partial(self._on_job_done, self.rabbitmq.connection, channel, delivery_tag, task_id)
+                )
+            else:
+                channel.basic_ack(delivery_tag=delivery_tag)
+            return True
+
+        if self.result_cache is None:
+            return False
+        results = self.result_cache.get(task_id)
+        if results is None:
+            return False
 
-    def _process_in_thread(self, file_path: str, task_id: str, analysis_request: dict):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        metrics.DUPLICATE_DELIVERIES_TOTAL.inc(queue=self.queue_name, state="completed")
+        if not (settings.DEDUP_REPLAY_RESULTS and results and self.producer):
+            channel.basic_ack(delivery_tag=delivery_tag)
+            logger.info("Duplicate delivery of completed task acked: queue=%s task_id=%s", self.queue_name, task_id)
+            return True
+
+        logger.info(
+            "Replaying %s cached results: queue=%s task_id=%s", len(results), self.queue_name, task_id
+        )
+        replayed = _gather([self.producer.publish(result_type, data) for result_type, data in results])
+        replayed.add_done_callback(
+            functools.partial(self._on_job_done, self.rabbitmq.connection, channel, delivery_tag, task_id)
+        )
+        return True
+
+    def _on_task_finished(self, task_id: str, future: Future):
+        self._running.pop(task_id, None)
+        if self.result_cache is None or future.cancelled() or future.exception() is not None:
+            return
+        results = future.result() or []
+        if any(result_type == "error" for result_type, _ in results):
+            # Failed outcomes are not cached so a redelivery or resubmission runs the task again
+            return
+        if not settings.DEDUP_REPLAY_RESULTS:
+            results = []
+        self.result_cache.put(task_id, results)
+
+    def _on_job_done(self, connection, channel, delivery_tag: int, task_id: str, future: Future):
+        success = not future.cancelled() and future.exception() is None
         try:
-            loop.run_until_complete(self.process_callback(file_path, task_id, analysis_request))
-        finally:
-            loop.close()
+            call_threadsafe(
+                connection, functools.partial(self._settle, channel, delivery_tag, task_id, success)
+            )
+        except Exception as e:
+            logger.warning(
+                "Cannot settle task_id=%s, connection is gone (message will be redelivered): %s",
+                task_id,
+                e,
+            )
 
-    def _publish_parse_error(self, task_id: str, error_msg: str):
-        from app.messaging.producer import AudioResultProducer
+    def _settle(self, channel, delivery_tag: int, task_id: str, success: bool):
+        if not channel.is_open:
+            logger.warning("Channel closed before settle: queue=%s task_id=%s", self.queue_name, task_id)
+            return
+        if success:
+            channel.basic_ack(delivery_tag=delivery_tag)
+            logger.info("Message acked: queue=%s task_id=%s", self.queue_name, task_id)
+        else:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+            logger.warning("Message nacked for redelivery: queue=%s task_id=%s", self.queue_name, task_id)
+
+    def _publish_parse_error(self, task_id: Optional[str], error_msg: str, kind: str):
+        self.parse_errors[kind] += 1
+        metrics.PARSE_ERRORS_TOTAL.inc(queue=self.queue_name, kind=kind)
+        if not task_id:
+            return
+        if not self.producer:
+            logger.warning("Producer is not configured, parse error not reported: task_id=%s", task_id)
+            return
+        if not self._parse_error_limiter.allow():
+            self.parse_errors["suppressed"] += 1
+            return
 
         error_message = {
             "taskId": task_id,
@@ -112,15 +351,78 @@ class BaseJobConsumer:
         }
 
         try:
-            producer = AudioResultProducer()
-            producer.publish(result_type="error", data=error_message)
-            producer.close()
+            future = self.producer.publish(result_type="error", data=error_message)
+            future.add_done_callback(self._on_parse_error_published)
         except Exception as e:
             logger.error("Failed to publish parse error message: %s", e)
 
+    def _on_parse_error_published(self, future: Future):
+        if future.exception() is not None:
+            logger.error("Failed to publish parse error message: %s", future.exception())
+
+    def parse_error_stats(self) -> dict:
+        return dict(self.parse_errors)
+
+    def pause(self):
+        """Stop receiving new deliveries (thread-safe); in-flight jobs still settle."""
+        if self._paused:
+            return
+        self._paused = True
+        logger.warning("Consumer paused: queue=%s", self.queue_name)
+        try:
+            call_threadsafe(self.rabbitmq.connection, self._cancel_consumer)
+        except Exception as e:
+            logger.debug("Consumer pause deferred until reconnect (queue=%s): %s", self.queue_name, e)
+
+    def resume(self):
+        """Resume receiving deliveries (thread-safe)."""
+        if not self._paused:
+            return
+        self._paused = False
+        logger.info("Consumer resumed: queue=%s", self.queue_name)
+        if self._async_transport:
+            # The blocking consume loop re-registers by itself; the asyncio transport needs a nudge
+            try:
+                call_threadsafe(self.rabbitmq.connection, self._basic_consume)
+            except Exception as e:
+                logger.debug("Consumer resume deferred until reconnect (queue=%s): %s", self.queue_name, e)
+
+    def _cancel_consumer(self):
+        if self._consumer_tag and self.rabbitmq.channel and self.rabbitmq.channel.is_open:
+            self.rabbitmq.channel.basic_cancel(self._consumer_tag)
+            self._consumer_tag = None
+
+    def set_prefetch(self, count: int):
+        """Change the unacked delivery window (thread-safe); kept across reconnects."""
+        if count == self.prefetch_count:
+            return
+        self.prefetch_count = count
+        try:
+            call_threadsafe(self.rabbitmq.connection, self._apply_prefetch)
+        except Exception as e:
+            logger.debug("Prefetch change deferred until reconnect (queue=%s): %s", self.queue_name, e)
+
+    def _apply_prefetch(self):
+        channel = self.rabbitmq.channel
+        if channel and channel.is_open:
+            channel.basic_qos(prefetch_count=self.prefetch_count)
+            logger.info("Consumer prefetch set: queue=%s prefetch=%s", self.queue_name, self.prefetch_count)
+
+    def on_workers_available(self, available: bool):
+        if available:
+            self.resume()
+        else:
+            self.pause()
+
     def stop(self):
         try:
             self._stop_requested = True
+            if self._async_transport:
+                connection = self.rabbitmq.connection
+                if connection and connection.is_open:
+                    call_threadsafe(connection, connection.close)
+                logger.info("Consumer stopped: queue=%s", self.queue_name)
+                return
             if (
                 self.rabbitmq.connection
                 and self.rabbitmq.connection.is_open
@@ -137,10 +439,24 @@ class BaseJobConsumer:
 
 
 class AudioJobConsumer(BaseJobConsumer):
-    def __init__(self, process_callback=None):
-        super().__init__(settings.RABBITMQ_JOB_QUEUE, process_callback)
+    def __init__(
+        self,
+        process_callback=None,
+        dispatcher: Optional[JobDispatcher] = None,
+        producer: Optional[AudioResultProducer] = None,
+        result_cache: Optional[TaskResultCache] = None,
+    ):
+        super().__init__(settings.RABBITMQ_JOB_QUEUE, process_callback, dispatcher, producer, result_cache)
 
 
 class ConversationJobConsumer(BaseJobConsumer):
-    def __init__(self, process_callback=None):
-        super().__init__(settings.RABBITMQ_CONVERSATION_JOB_QUEUE, process_callback)
+    def __init__(
+        self,
+        process_callback=None,
+        dispatcher: Optional[JobDispatcher] = None,
+        producer: Optional[AudioResultProducer] = None,
+        result_cache: Optional[TaskResultCache] = None,
+    ):
+        super().__init__(
+            settings.RABBITMQ_CONVERSATION_JOB_QUEUE, process_callback, dispatcher, producer, result_cache
+        )
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.services.file_service import submit_io
+
+logger = logging.getLogger(__name__)
+
+# Results are kept as [result_type, data] pairs in publish order
+TaskResults = list[tuple[str, dict]]
+
+
+class _FileStore:
+    """
+    One JSON file per completed taskId; survives restarts of the gateway.
+    Every method does blocking file I/O and runs on the file I/O pool.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _file(self, task_id: str) -> Path:
+        return self.path / (hashlib.sha1(task_id.encode("utf-8")).hexdigest() + ".json")
+
+    def load(self, ttl_sec: float) -> list[tuple[str, float, TaskResults]]:
+        """Return the unexpired records, oldest first."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        expire_before = time.time() - ttl_sec
+        records = []
+        for entry in self.path.glob("*.json"):
+            try:
+                with open(entry, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                task_id, completed_at = record["taskId"], record["completedAt"]
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning("Dedup store read failed for %s: %s", entry.name, e)
+                continue
+            if completed_at >= expire_before:
+                records.append((task_id, completed_at, [tuple(item) for item in record["results"]]))
+        records.sort(key=lambda record: record[1])
+        return records
+
+    def put(self, task_id: str, completed_at: float, results: TaskResults):
+        target = self._file(task_id)
+        tmp = target.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"taskId": task_id, "completedAt": completed_at, "results": results}, f, ensure_ascii=False)
+            os.replace(tmp, target)
+        except Exception as e:
+            logger.warning("Dedup store write failed for task_id=%s: %s", task_id, e)
+
+    def prune(self, max_entries: int, ttl_sec: float):
+        try:
+            files = sorted(
+                ((entry.stat().st_mtime, entry) for entry in self.path.glob("*.json")),
+                key=lambda item: item[0],
+            )
+        except Exception as e:
+            logger.warning("Dedup store prune failed: %s", e)
+            return
+        expire_before = time.time() - ttl_sec
+        excess = len(files) - max_entries
+        for i, (mtime, entry) in enumerate(files):
+            if i >= excess and mtime >= expire_before:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class TaskResultCache:
+    """
+    Bounded, TTL-evicting record of completed taskIds (thread-safe).
+
+    Consumers consult it on every delivery so a redelivered job is settled
+    without re-running the AI analysis. Lookups only touch the in-memory LRU.
+    An optional directory store keeps records across restarts: it is loaded
+    once at startup (load_store) and written behind on the file I/O pool, so
+    no store I/O runs on the consumer or dispatcher threads.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, max_entries: int, ttl_sec: float, store_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries: "OrderedDict[str, tuple[float, TaskResults]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._store = _FileStore(store_path) if store_path else None
+        self._puts = 0
+        self._prune_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls) -> Optional["TaskResultCache"]:
+        if not settings.DEDUP_ENABLED:
+            return None
+        return cls(settings.DEDUP_MAX_ENTRIES, settings.DEDUP_TTL_SEC, settings.DEDUP_STORE_PATH or None)
+
+    def load_store(self):
+        """Fill the LRU from the directory store (blocking; run on the file I/O pool before consuming)."""
+        if self._store is None:
+            return
+        records = self._store.load(self.ttl_sec)
+        for task_id, completed_at, results in records:
+            self._remember(task_id, (completed_at, results))
+        logger.info("Dedup store loaded: %s records from %s", len(records), self._store.path)
+
+    def get(self, task_id: str) -> Optional[TaskResults]:
+        """Return the cached results of a completed task, or None if it is unknown or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is not None and now - entry[0] > self.ttl_sec:
+                del self._entries[task_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(task_id)
+            self.hits += 1
+        return entry[1]
+
+    def put(self, task_id: str, results: TaskResults):
+        entry = (time.time(), list(results))
+        self._remember(task_id, entry)
+        if self._store is not None:
+            self._puts += 1
+            prune = self._puts % self.PRUNE_EVERY == 0
+            submit_io(self._write_behind, task_id, entry, prune)
+
+    def _write_behind(self, task_id: str, entry: tuple[float, TaskResults], prune: bool):
+        # Runs on the file I/O pool; a prune already in progress makes later ones skip
+        self._store.put(task_id, *entry)
+        if prune and self._prune_lock.acquire(blocking=False):
+            try:
+                self._store.prune(self.max_entries, self.ttl_sec)
+            finally:
+                self._prune_lock.release()
+
+    def _remember(self, task_id: str, entry: tuple[float, TaskResults]):
+        with self._lock:
+            self._entries[task_id] = entry
+            self._entries.move_to_end(task_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,250 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+from app.core import metrics, tracing
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobContext:
+    __slots__ = ("queue_name", "received_at", "first_result_at", "trace", "cost")
+
+    def __init__(self, queue_name: str, received_at: float, trace: Optional[tracing.Trace] = None):
+        self.queue_name = queue_name
+        self.received_at = received_at
+        self.first_result_at: Optional[float] = None
+        self.trace = trace
+        self.cost = 0.0  # estimated work (e.g. seconds of audio), 0 when unknown
+
+    def mark_result(self):
+        """Record time-to-first-result once per job."""
+        if self.first_result_at is None:
+            self.first_result_at = time.monotonic()
+            if self.trace is not None:
+                self.trace.add_span("first_result", self.trace.start_ns, time.time_ns())
+            elapsed = self.first_result_at - self.received_at
+            metrics.JOB_FIRST_RESULT_SECONDS.observe(elapsed, queue=self.queue_name)
+            if elapsed > settings.JOB_FIRST_RESULT_SLO_SEC:
+                metrics.JOB_FIRST_RESULT_SLO_MISSES_TOTAL.inc(queue=self.queue_name)
+                logger.warning(
+                    "First result SLO missed: queue=%s elapsed=%.2fs slo=%.2fs",
+                    self.queue_name,
+                    elapsed,
+                    settings.JOB_FIRST_RESULT_SLO_SEC,
+                )
+
+
+# Set for the duration of each dispatched job
+current_job: contextvars.ContextVar[Optional[JobContext]] = contextvars.ContextVar("current_job", default=None)
+
+
+class _QueueState:
+    __slots__ = ("name", "weight", "max_in_flight", "active", "waiting", "pass_value")
+
+    def __init__(self, name: str, weight: float, max_in_flight: int):
+        self.name = name
+        self.weight = weight
+        self.max_in_flight = max_in_flight
+        self.active = 0
+        self.waiting: list[tuple[int, float, int, asyncio.Future]] = []  # heap of (-priority, start_by, seq, waiter)
+        self.pass_value = 0.0
+
+    @property
+    def eligible(self) -> bool:
+        return bool(self.waiting) and self.active < self.max_in_flight
+
+
+class JobDispatcher:
+    """
+    Runs jobs from all consumers on one event loop under a shared concurrency budget.
+
+    Free slots go to the queue with the lowest stride-scheduling pass value
+    (each start advances it by 1/weight), so queues share the budget in
+    proportion to their weights; within a queue, higher AMQP message
+    priority starts first.
+
+    With a cost estimator, jobs of equal priority start in order of
+    received_at + cost * cost_wait_ratio: short jobs overtake long ones, but
+    a long job is only overtaken by jobs that arrive within its cost-based
+    allowance, so it cannot starve. Without one the order is FIFO.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        global_max_in_flight: Optional[int] = None,
+        weights: Optional[dict[str, float]] = None,
+        cost_estimator: Optional[Callable[..., Awaitable[float]]] = None,
+    ):
+        self.max_in_flight = max_in_flight or settings.JOB_MAX_IN_FLIGHT
+        self.global_max_in_flight = global_max_in_flight or settings.JOB_GLOBAL_MAX_IN_FLIGHT
+        # Configured limits; resize() scales from these so their ratio is kept
+        self._base_max_in_flight = self.max_in_flight
+        self._base_global_max_in_flight = self.global_max_in_flight
+        self.weights = weights or {
+            settings.RABBITMQ_JOB_QUEUE: settings.JOB_AUDIO_WEIGHT,
+            settings.RABBITMQ_CONVERSATION_JOB_QUEUE: settings.JOB_CONVERSATION_WEIGHT,
+        }
+        # Awaited with the job's callback args on the loop before the job queues for a slot
+        self.cost_estimator = cost_estimator
+        self.cost_wait_ratio = settings.JOB_COST_WAIT_RATIO
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._queues: dict[str, _QueueState] = {}
+        self._running = 0
+        self._seq = itertools.count()
+        metrics.ACTIVE_JOBS.set_function(lambda: {(queue,): n for queue, n in self.active_jobs().items()})
+        metrics.WAITING_JOBS.set_function(lambda: {(queue,): n for queue, n in self.waiting_jobs().items()})
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        logger.info("Dispatcher started: max_in_flight=%s", self.max_in_flight)
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def submit(
+        self,
+        queue_name: str,
+        callback,
+        *args,
+        priority: int = 0,
+        trace: Optional[tracing.Trace] = None,
+    ) -> Future:
+        """Schedule `callback(*args)` on the shared loop, bounded per queue and globally."""
+        if not self.loop or not self.loop.is_running():
+            raise RuntimeError("Dispatcher is not running")
+        job = JobContext(queue_name, time.monotonic(), trace)
+        return asyncio.run_coroutine_threadsafe(self._run_job(job, priority, callback, *args), self.loop)
+
+    def call(self, callback, *args) -> Future:
+        """Run `callback(*args)` on the shared loop without a concurrency slot."""
+        if not self.loop or not self.loop.is_running():
+            raise RuntimeError("Dispatcher is not running")
+        return asyncio.run_coroutine_threadsafe(callback(*args), self.loop)
+
+    def _queue(self, queue_name: str) -> _QueueState:
+        state = self._queues.get(queue_name)
+        if state is None:
+            state = self._queues[queue_name] = _QueueState(
+                queue_name, self.weights.get(queue_name, 1.0), self.max_in_flight
+            )
+        return state
+
+    def _schedule(self):
+        while self._running < self.global_max_in_flight:
+            eligible = [state for state in self._queues.values() if state.eligible]
+            if not eligible:
+                return
+            state = min(eligible, key=lambda q: q.pass_value)
+            *_, waiter = heapq.heappop(state.waiting)
+            if waiter.done():  # cancelled while waiting
+                continue
+            waiter.set_result(None)
+            state.active += 1
+            self._running += 1
+            state.pass_value += 1 / state.weight
+
+    async def _acquire(self, state: _QueueState, priority: int, start_by: float):
+        if not state.waiting and state.active == 0:
+            # An idle queue re-enters at the current minimum pass, without banked credit
+            busy = [q.pass_value for q in self._queues.values() if q is not state and (q.active or q.waiting)]
+            if busy:
+                state.pass_value = max(state.pass_value, min(busy))
+        waiter = self.loop.create_future()
+        heapq.heappush(state.waiting, (-priority, start_by, next(self._seq), waiter))
+        self._schedule()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release(state)
+            raise
+
+    def _release(self, state: _QueueState):
+        state.active -= 1
+        self._running -= 1
+        self._schedule()
+
+    async def _run_job(self, job: JobContext, priority: int, callback, *args):
+        queue_name = job.queue_name
+        state = self._queue(queue_name)
+
+        waiting_ns = time.time_ns()
+        if self.cost_estimator is not None:
+            try:
+                job.cost = await self.cost_estimator(*args)
+            except Exception as e:
+                # The job itself reports the problem; schedule it as a cheap job so it fails fast
+                logger.debug("Cost estimate failed on queue=%s: %s", queue_name, e)
+        await self._acquire(state, priority, job.received_at + job.cost * self.cost_wait_ratio)
+        metrics.JOB_QUEUE_WAIT_SECONDS.observe(time.monotonic() - job.received_at, queue=queue_name)
+        current_job.set(job)
+        trace_token = tracing.current_trace.set(job.trace)
+        if job.trace is not None:
+            job.trace.add_span("queue_wait", waiting_ns, time.time_ns(), cost=job.cost)
+        try:
+            return await callback(*args)
+        except Exception as e:
+            logger.error("Job failed on queue=%s: %s", queue_name, e)
+            if job.trace is not None:
+                job.trace.error = str(e) or type(e).__name__
+            raise
+        finally:
+            self._release(state)
+            metrics.JOB_DURATION_SECONDS.observe(time.monotonic() - job.received_at, queue=queue_name)
+            tracing.current_trace.reset(trace_token)
+            if job.trace is not None:
+                tracing.finish_trace(job.trace)
+
+    def resize(self, limit: int):
+        """
+        Set the global budget to `limit` and scale the per-queue caps by the
+        same factor (loop thread only). Queue weights are left unchanged.
+        """
+        scaled = math.ceil(self._base_max_in_flight * limit / self._base_global_max_in_flight)
+        self.max_in_flight = max(1, min(limit, scaled))
+        self.global_max_in_flight = limit
+        for state in self._queues.values():
+            state.max_in_flight = self.max_in_flight
+        self._schedule()
+
+    def active_jobs(self) -> dict[str, int]:
+        return {name: state.active for name, state in list(self._queues.items())}
+
+    def waiting_jobs(self) -> dict[str, int]:
+        return {name: len(state.waiting) for name, state in list(self._queues.items())}
+
+    def stop(self, timeout: float = 10.0):
+        if not self.loop or not self._thread:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=timeout)
+        logger.info("Dispatcher stopped")
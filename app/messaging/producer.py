@@ -1,16 +1,39 @@
-﻿import json
+﻿import asyncio
+import json
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional
 
 import pika
 
+from app.core import metrics, tracing
 from app.core.config import settings
-from app.messaging.rabbitmq import RabbitMQConnection
+from app.messaging.rabbitmq import RabbitMQConnection, call_threadsafe
 
 logger = logging.getLogger(__name__)
 
 
-class AudioResultProducer:
-    def __init__(self):
+class _PendingMessage:
+    __slots__ = ("queue_name", "result_type", "body", "future", "attempts", "sent_at")
+
+    def __init__(self, queue_name: str, result_type: str, body: str):
+        self.queue_name = queue_name
+        self.result_type = result_type
+        self.body = body
+        self.future: Future = Future()
+        self.attempts = 0
+        self.sent_at = 0.0
+
+
+class _PublisherConnection:
+    """One confirm-mode channel driven by its own I/O thread (or a shared event loop); safe to submit to from any thread."""
+
+    def __init__(self, index: int, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.index = index
+        self.loop = loop
         self.rabbitmq = RabbitMQConnection(
             host=settings.RABBITMQ_HOST,
             port=settings.RABBITMQ_PORT,
@@ -24,20 +47,258 @@ class AudioResultProducer:
             socket_timeout_sec=settings.RABBITMQ_SOCKET_TIMEOUT_SEC,
         )
         self._connected = False
+        self._closing = False
+        self._start_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_future: Optional[Future] = None
+        self._closed: Optional[asyncio.Future] = None
+        self._connection = None
+        self._channel = None
+
+        # Results waiting to be published, and published-but-unconfirmed by delivery tag
+        self._buffer: deque[_PendingMessage] = deque()
+        self._outstanding: dict[int, _PendingMessage] = {}
+        self._delivery_tag = 0
+
+        self.confirm_count = 0
+        self.confirm_latency_sum = 0.0
+        self.confirm_latency_max = 0.0
+        self.failed_count = 0
+
+    def start(self):
+        with self._start_lock:
+            if self.loop is not None:
+                if self._run_future is None or self._run_future.done():
+                    self._closing = False
+                    self._run_future = asyncio.run_coroutine_threadsafe(self._run_async(), self.loop)
+                return
+            if self._thread and self._thread.is_alive():
+                return
+            self._closing = False
+            self._thread = threading.Thread(
+                target=self._run, name=f"result-producer-{self.index}", daemon=True
+            )
+            self._thread.start()
+
+    def wait_ready(self, timeout: float) -> bool:
+        return self._ready.wait(timeout=timeout)
+
+    def _run(self):
+        reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+        while not self._closing:
+            try:
+                self._connection = self.rabbitmq.connect_select(
+                    on_open=self._on_connection_open,
+                    on_open_error=self._on_connection_open_error,
+                    on_close=self._on_connection_closed,
+                )
+                self._connection.ioloop.start()
+            except Exception as e:
+                logger.error("Producer I/O loop error: %s", e)
+            if self._connected:
+                reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+            self._connected = False
+            if self._closing:
+                break
+            logger.info("Producer reconnecting in %ss", reconnect_delay)
+            time.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, settings.RABBITMQ_RECONNECT_MAX_DELAY_SEC)
+
+    async def _run_async(self):
+        reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+        while not self._closing:
+            self._closed = self.loop.create_future()
+            try:
+                self._connection = self.rabbitmq.connect_asyncio(
+                    on_open=self._on_connection_open,
+                    on_open_error=self._on_connection_open_error,
+                    on_close=self._on_connection_closed,
+                    loop=self.loop,
+                )
+                await self._closed
+            except Exception as e:
+                logger.error("Producer connection error: %s", e)
+            if self._connected:
+                reconnect_delay = settings.RABBITMQ_RECONNECT_INITIAL_DELAY_SEC
+            self._connected = False
+            if self._closing:
+                break
+            logger.info("Producer reconnecting in %ss", reconnect_delay)
+            await asyncio.sleep(reconnect_delay)
+            reconnect_delay = min(reconnect_delay * 2, settings.RABBITMQ_RECONNECT_MAX_DELAY_SEC)
+
+    def _finish_connection(self, connection):
+        if self.loop is not None:
+            if self._closed is not None and not self._closed.done():
+                self._closed.set_result(None)
+        else:
+            connection.ioloop.stop()
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error):
+        logger.error("Producer connection failed: %r", error)
+        self._finish_connection(connection)
+
+    def _on_connection_closed(self, connection, reason):
+        self._channel = None
+        self._ready.clear()
+        self._requeue_outstanding()
+        if not self._closing:
+            logger.warning("Producer connection closed: %s", reason)
+        self._finish_connection(connection)
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        self._delivery_tag = 0
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.confirm_delivery(ack_nack_callback=self._on_delivery_confirmation)
+        self._connected = True
+        self._ready.set()
+        logger.info("Producer connected: connection=%s", self.index)
+        self._drain()
+
+    def _on_channel_closed(self, channel, reason):
+        logger.warning("Producer channel closed: %s", reason)
+        self._channel = None
+        if self._connection and self._connection.is_open:
+            self._connection.close()
+
+    def _requeue_outstanding(self):
+        # Unconfirmed messages go back to the front of the buffer in publish order
+        for tag in sorted(self._outstanding, reverse=True):
+            self._retry(self._outstanding.pop(tag), "connection lost")
+
+    def _retry(self, message: _PendingMessage, reason: str):
+        if message.attempts >= settings.PRODUCER_MAX_ATTEMPTS:
+            self.failed_count += 1
+            metrics.PUBLISH_FAILURES_TOTAL.inc(queue=message.queue_name)
+            logger.error(
+                "Result dropped after %s attempts: queue=%s type=%s reason=%s",
+                message.attempts,
+                message.queue_name,
+                message.result_type,
+                reason,
+            )
+            message.future.set_exception(RuntimeError(f"Publish not confirmed: {reason}"))
+            return
+        self._buffer.appendleft(message)
+
+    def _drain(self):
+        channel = self._channel
+        if channel is None or not channel.is_open:
+            return
+        while self._buffer and len(self._outstanding) < settings.PRODUCER_MAX_UNCONFIRMED:
+            message = self._buffer.popleft()
+            message.attempts += 1
+            message.sent_at = time.monotonic()
+            try:
+                channel.basic_publish(
+                    exchange="",
+                    routing_key=message.queue_name,
+                    body=message.body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,
+                        content_type="application/json",
+                    ),
+                )
+            except Exception as e:
+                logger.warning("Publish failed, will retry after reconnect: %s", e)
+                self._retry(message, str(e))
+                return
+            self._delivery_tag += 1
+            self._outstanding[self._delivery_tag] = message
+
+    def _on_delivery_confirmation(self, frame):
+        method = frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        if method.multiple:
+            tags = [tag for tag in self._outstanding if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag] if method.delivery_tag in self._outstanding else []
+
+        now = time.monotonic()
+        for tag in tags:
+            message = self._outstanding.pop(tag)
+            if acked:
+                latency = now - message.sent_at
+                self.confirm_count += 1
+                self.confirm_latency_sum += latency
+                self.confirm_latency_max = max(self.confirm_latency_max, latency)
+                metrics.PUBLISH_CONFIRM_SECONDS.observe(latency, queue=message.queue_name)
+                message.future.set_result(None)
+                logger.info("Result published to %s, type=%s", message.queue_name, message.result_type)
+            else:
+                logger.warning("Result nacked by broker: queue=%s type=%s", message.queue_name, message.result_type)
+                self._retry(message, "nacked by broker")
+        self._drain()
+
+    def submit(self, message: _PendingMessage):
+        self._buffer.append(message)
+        self.start()
+        self._wake()
+
+    def _wake(self):
+        connection = self._connection
+        if connection is None or not connection.is_open:
+            return
+        try:
+            call_threadsafe(connection, self._drain)
+        except Exception as e:
+            logger.debug("Producer wake-up skipped: %s", e)
+
+    def pending_count(self) -> int:
+        return len(self._buffer) + len(self._outstanding)
+
+    def close(self):
+        try:
+            running = (self._thread and self._thread.is_alive()) or (
+                self._run_future is not None and not self._run_future.done()
+            )
+            if running:
+                self._closing = True
+                connection = self._connection
+                if connection is not None and connection.is_open:
+                    call_threadsafe(connection, connection.close)
+                if self._thread:
+                    self._thread.join(timeout=settings.PRODUCER_CLOSE_TIMEOUT_SEC)
+                elif connection is None or not connection.is_open:
+                    # Between reconnect attempts there is nothing to close gracefully
+                    self._run_future.cancel()
+                else:
+                    self._run_future.result(timeout=settings.PRODUCER_CLOSE_TIMEOUT_SEC)
+                self._connected = False
+        except Exception as e:
+            logger.error("Failed to close producer connection %s: %s", self.index, e)
+        while self._buffer:
+            message = self._buffer.popleft()
+            if not message.future.done():
+                message.future.set_exception(RuntimeError("Producer closed before publish"))
+
+
+class AudioResultProducer:
+    def __init__(self, connections: Optional[int] = None, loop: Optional[asyncio.AbstractEventLoop] = None):
+        # With a loop (RABBITMQ_TRANSPORT=asyncio) connections run on it instead of their own threads
+        self._connections = [
+            _PublisherConnection(index, loop) for index in range(connections or settings.PRODUCER_CONNECTIONS)
+        ]
 
     def connect(self):
-        if (
-            not self._connected
-            or not self.rabbitmq.connection
-            or self.rabbitmq.connection.is_closed
-            or not self.rabbitmq.channel
-            or self.rabbitmq.channel.is_closed
-        ):
-            self.rabbitmq.connect()
-            self._connected = True
-            logger.info("Producer connected")
-
-    def publish(self, result_type: str, data: dict):
+        for connection in self._connections:
+            connection.start()
+        deadline = time.monotonic() + settings.RABBITMQ_SOCKET_TIMEOUT_SEC
+        for connection in self._connections:
+            if not connection.wait_ready(max(deadline - time.monotonic(), 0)):
+                logger.warning("Producer connection %s not ready yet, results will be buffered", connection.index)
+
+    def publish(self, result_type: str, data: dict, ordering_key: Optional[str] = None) -> Future:
+        """Thread-safe; returns a future resolved once the broker confirms the message.
+
+        Messages sharing an `ordering_key` go out on the same connection, so they
+        reach the queue in publish order (barring redelivery after a reconnect).
+        """
         queue_map = {
             "pron": settings.RABBITMQ_PRON_QUEUE,
             "inton": settings.RABBITMQ_INTON_QUEUE,
@@ -53,39 +314,54 @@ class AudioResultProducer:
             payload = data
         message_body = json.dumps(payload, ensure_ascii=False)
 
-        try:
-            self.connect()
-            self.rabbitmq.channel.basic_publish(
-                exchange="",
-                routing_key=queue_name,
-                body=message_body,
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                    content_type="application/json",
-                ),
+        message = _PendingMessage(queue_name, result_type, message_body)
+        trace = tracing.current_trace.get()
+        if trace is not None:
+            started_ns = time.time_ns()
+            message.future.add_done_callback(
+                lambda future: trace.add_span(
+                    "publish",
+                    started_ns,
+                    time.time_ns(),
+                    queue=queue_name,
+                    confirmed=not future.cancelled() and future.exception() is None,
+                )
             )
-            logger.info("Result published to %s, type=%s", queue_name, result_type)
-        except Exception as e:
-            logger.warning("Publish failed, retrying once after reconnect: %s", e)
-            self._connected = False
-            self.rabbitmq.close()
-            self.connect()
-            self.rabbitmq.channel.basic_publish(
-                exchange="",
-                routing_key=queue_name,
-                body=message_body,
-                properties=pika.BasicProperties(
-                    delivery_mode=2,
-                    content_type="application/json",
-                ),
-            )
-            logger.info("Result published after reconnect to %s, type=%s", queue_name, result_type)
+        if ordering_key is not None:
+            connection = self._connections[hash(ordering_key) % len(self._connections)]
+        else:
+            connection = min(self._connections, key=lambda c: c.pending_count())
+        connection.submit(message)
+        return message.future
+
+    async def publish_async(self, result_type: str, data: dict):
+        """Awaitable variant of publish() for asyncio tasks."""
+        await asyncio.wrap_future(self.publish(result_type, data))
+
+    def pending_count(self) -> int:
+        return sum(c.pending_count() for c in self._connections)
+
+    def confirm_stats(self) -> dict:
+        confirmed = sum(c.confirm_count for c in self._connections)
+        latency_sum = sum(c.confirm_latency_sum for c in self._connections)
+        return {
+            "connections": len(self._connections),
+            "confirmed": confirmed,
+            "failed": sum(c.failed_count for c in self._connections),
+            "pending": self.pending_count(),
+            "confirm_latency_avg_ms": latency_sum / confirmed * 1000 if confirmed else None,
+            "confirm_latency_max_ms": max(c.confirm_latency_max for c in self._connections) * 1000,
+        }
+
+    def flush(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self.pending_count()
 
     def close(self):
-        try:
-            if self._connected and self.rabbitmq:
-                self.rabbitmq.close()
-                self._connected = False
-                logger.info("Producer closed successfully")
-        except Exception as e:
-            logger.error("Failed to close producer: %s", e)
+        if not self.flush(settings.PRODUCER_CLOSE_TIMEOUT_SEC):
+            logger.warning("Producer closing with %s unconfirmed results", self.pending_count())
+        for connection in self._connections:
+            connection.close()
+        logger.info("Producer closed successfully")
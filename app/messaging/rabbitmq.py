@@ -1,11 +1,23 @@
 ﻿import logging
-from typing import Optional
+from typing import Optional, Union
 
 import pika
+from pika.adapters.asyncio_connection import AsyncioConnection
 
 logger = logging.getLogger(__name__)
 
 
+def call_threadsafe(connection, callback):
+    """Run `callback` on the thread/loop that owns `connection` (blocking, select or asyncio)."""
+    if isinstance(connection, pika.BlockingConnection):
+        connection.add_callback_threadsafe(callback)
+    elif isinstance(connection, AsyncioConnection):
+        # The asyncio adapter exposes the native event loop as its ioloop
+        connection.ioloop.call_soon_threadsafe(callback)
+    else:
+        connection.ioloop.add_callback_threadsafe(callback)
+
+
 class RabbitMQConnection:
     def __init__(
         self,
@@ -30,12 +42,12 @@ class RabbitMQConnection:
         self.connection_attempts = connection_attempts
         self.retry_delay_sec = retry_delay_sec
         self.socket_timeout_sec = socket_timeout_sec
-        self.connection: Optional[pika.BlockingConnection] = None
+        self.connection: Optional[Union[pika.BlockingConnection, AsyncioConnection]] = None
         self.channel: Optional[pika.channel.Channel] = None
 
-    def connect(self):
+    def parameters(self) -> pika.ConnectionParameters:
         credentials = pika.PlainCredentials(self.username, self.password)
-        parameters = pika.ConnectionParameters(
+        return pika.ConnectionParameters(
             host=self.host,
             port=self.port,
             virtual_host=self.vhost,
@@ -46,10 +58,32 @@ class RabbitMQConnection:
             retry_delay=self.retry_delay_sec,
             socket_timeout=self.socket_timeout_sec,
         )
-        self.connection = pika.BlockingConnection(parameters)
+
+    def connect(self):
+        self.connection = pika.BlockingConnection(self.parameters())
         self.channel = self.connection.channel()
         logger.info("RabbitMQ connected: %s:%s", self.host, self.port)
 
+    def connect_select(self, on_open, on_open_error, on_close) -> pika.SelectConnection:
+        """Callback-based connection; the caller runs `connection.ioloop.start()` on its own thread."""
+        return pika.SelectConnection(
+            parameters=self.parameters(),
+            on_open_callback=on_open,
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close,
+        )
+
+    def connect_asyncio(self, on_open, on_open_error, on_close, loop) -> AsyncioConnection:
+        """Callback-based connection driven by an existing asyncio event loop."""
+        self.connection = AsyncioConnection(
+            parameters=self.parameters(),
+            on_open_callback=on_open,
+            on_open_error_callback=on_open_error,
+            on_close_callback=on_close,
+            custom_ioloop=loop,
+        )
+        return self.connection
+
     def close(self):
         if self.connection and not self.connection.is_closed:
             self.connection.close()
@@ -0,0 +1,133 @@
+# ai-gateway/app/services/analysis_cache.py
+# 동일 음성 파일 + 동일 analysisRequest 분석 결과 캐시 (내용 주소 기반, 로컬 디스크 LRU)
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.services.file_service import FileService
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    AI 분석 결과 라인을 파일 내용 해시 + 정규화된 요청 기준으로 보관하는 디스크 캐시
+    - 키: sha256(엔드포인트 + 파일 SHA-256 + 정렬된 analysisRequest JSON)
+    - 값: 결과 라인 NDJSON 파일 하나 (taskId는 재생 시 현재 작업의 것으로 교체)
+    - 전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+    (블로킹 파일 I/O이므로 이벤트 루프에서는 file_service.run_io로 파일 I/O 스레드 풀에서 호출)
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> 파일 크기 (사용 순서)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+
+    @classmethod
+    def from_settings(cls) -> Optional["AnalysisCache"]:
+        if not settings.ANALYSIS_CACHE_DIR:
+            return None
+        return cls(settings.ANALYSIS_CACHE_DIR, settings.ANALYSIS_CACHE_MAX_BYTES)
+
+    def _load_index(self):
+        # 재시작 시 기존 캐시 파일을 마지막 사용 시각 순으로 복구
+        files = sorted(self.directory.glob("*.ndjson"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._evict()
+        logger.info(f"분석 캐시 로드: {len(self._entries)}개, {self._total_bytes} bytes")
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.ndjson"
+
+    @staticmethod
+    def make_key(file_path: str, endpoint: str, analysis_request: dict) -> str:
+        """
+        파일 내용과 요청 내용으로 캐시 키 생성 (파일 경로/taskId와 무관)
+        """
+        request = json.dumps(analysis_request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256()
+        digest.update(endpoint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(FileService.hash_file(file_path).encode("ascii"))
+        digest.update(b"\0")
+        digest.update(request.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[list[dict]]:
+        """
+        캐시된 결과 라인 목록 반환 (없으면 None)
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            os.utime(path)  # 재시작 후에도 LRU 순서 유지
+            return lines
+        except Exception as e:
+            logger.warning(f"분석 캐시 읽기 실패: {key}, 에러: {e}")
+            self._remove(key)
+            return None
+
+    def put(self, key: str, lines: list[dict]):
+        """
+        결과 라인 목록 저장 (tmp 파일에 쓴 뒤 교체)
+        """
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                for line in lines:
+                    f.write(json.dumps(line, ensure_ascii=False) + "\n")
+            os.replace(tmp, path)
+            size = path.stat().st_size
+        except Exception as e:
+            logger.warning(f"분석 캐시 저장 실패: {key}, 에러: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += size - self._entries.get(key, 0)
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+        self._evict()
+
+    def _remove(self, key: str):
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is None:
+                return
+            self._total_bytes -= size
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                if self._total_bytes <= self.max_bytes or not self._entries:
+                    return
+                key = next(iter(self._entries))
+            self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
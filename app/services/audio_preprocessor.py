@@ -0,0 +1,160 @@
+# ai-gateway/app/services/audio_preprocessor.py
+# AI 서버 업로드 전 음성 변환 (WAV 헤더 파싱, 다운믹스, 리샘플링)
+
+import io
+import logging
+import struct
+import time
+from typing import BinaryIO, Optional
+
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.services.file_service import FileService
+from app.services.wav import WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM, WavInfo, parse_wav_header
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 변환 없이 원본 업로드
+    np = None
+    if settings.AI_AUDIO_PREPROCESS:
+        logger.warning("numpy 패키지가 없어 음성 변환 없이 원본을 업로드합니다")
+
+# 다운샘플링 전 앨리어싱 방지 저역 통과 필터 탭 수 (홀수)
+FILTER_TAPS = 63
+
+
+def _decode_samples(data: bytes, info: WavInfo):
+    """
+    PCM(8/16/24/32비트) / float(32/64비트) 샘플을 [-1, 1] float32 (frames, channels) 배열로 변환
+    """
+    data = data[: len(data) - len(data) % info.block_align]
+    bits = info.bits_per_sample
+    if info.audio_format == WAVE_FORMAT_PCM:
+        if bits == 8:
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+        elif bits == 16:
+            samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768
+        elif bits == 24:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            samples = np.where(values >= 1 << 23, values - (1 << 24), values).astype(np.float32) / (1 << 23)
+        elif bits == 32:
+            samples = np.frombuffer(data, dtype="<i4").astype(np.float32) / (1 << 31)
+        else:
+            raise ValueError(f"지원하지 않는 PCM 비트 수: {bits}")
+    elif info.audio_format == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        samples = np.frombuffer(data, dtype="<f4" if bits == 32 else "<f8").astype(np.float32)
+    else:
+        raise ValueError(f"지원하지 않는 WAV 포맷: format={info.audio_format}, bits={bits}")
+    return samples.reshape(-1, info.channels)
+
+
+def _resample(samples, source_rate: int, target_rate: int):
+    """
+    1차원 신호 리샘플링 (다운샘플링 시 windowed-sinc 저역 통과 필터 적용 후 보간/솎아내기)
+    """
+    if target_rate < source_rate:
+        cutoff = 0.5 * target_rate / source_rate  # 목표 나이퀴스트 주파수 (cycles/sample)
+        n = np.arange(FILTER_TAPS) - (FILTER_TAPS - 1) / 2
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(FILTER_TAPS)
+        kernel /= kernel.sum()
+        samples = np.convolve(samples, kernel.astype(np.float32), mode="same")
+    if source_rate % target_rate == 0:
+        return samples[:: source_rate // target_rate]
+    length = len(samples) * target_rate // source_rate
+    positions = np.arange(length) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def _encode_wav(samples, sample_rate: int) -> bytes:
+    """
+    float32 (frames, channels) 배열을 16비트 PCM WAV로 인코딩
+    """
+    frames, channels = samples.shape
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE",
+        b"fmt ", 16, WAVE_FORMAT_PCM, channels, sample_rate, sample_rate * channels * 2, channels * 2, 16,
+        b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def convert_wav(f: BinaryIO, sample_rate: int, channels: int) -> Optional[bytes]:
+    """
+    WAV를 sample_rate / channels 16비트 PCM으로 변환 (업샘플링/업믹스는 하지 않음)
+
+    Returns:
+        변환된 WAV 바이트 (이미 목표 형식 이하이면 None)
+
+    Raises:
+        ValueError: WAV 헤더가 잘못되었거나 지원하지 않는 포맷
+    """
+    info = parse_wav_header(f)
+    target_rate = min(sample_rate, info.sample_rate)
+    target_channels = min(channels, info.channels)
+    if (
+        target_rate == info.sample_rate
+        and target_channels == info.channels
+        and info.audio_format == WAVE_FORMAT_PCM
+        and info.bits_per_sample == 16
+    ):
+        return None
+
+    samples = _decode_samples(f.read(info.data_size), info)
+    if target_channels < info.channels:
+        if target_channels == 1:
+            samples = samples.mean(axis=1, keepdims=True)
+        else:
+            samples = samples[:, :target_channels]  # 앞쪽 채널만 사용
+    if target_rate != info.sample_rate:
+        samples = np.stack(
+            [_resample(samples[:, c], info.sample_rate, target_rate) for c in range(samples.shape[1])], axis=1
+        )
+    return _encode_wav(samples, target_rate)
+
+
+def _target_sample_rate(endpoint: str) -> int:
+    if endpoint == "conversation":
+        return settings.AI_CONVERSATION_SAMPLE_RATE
+    return settings.AI_ANALYZE_SAMPLE_RATE
+
+
+def open_for_upload(file_path: str, endpoint: str) -> BinaryIO:
+    """
+    업로드할 파일 객체 반환 (블로킹, 파일 I/O 스레드에서 실행)
+    변환이 꺼져 있거나 필요 없거나 실패하면 원본 파일을 그대로 반환
+
+    Args:
+        file_path: 음성 파일 경로
+        endpoint: AI 서버 엔드포인트 (analyze / conversation) - 엔드포인트별 목표 샘플레이트 적용
+    """
+    f = FileService.open_file(file_path)
+    sample_rate = _target_sample_rate(endpoint)
+    if np is None or not settings.AI_AUDIO_PREPROCESS or sample_rate <= 0:
+        return f
+
+    started = time.monotonic()
+    try:
+        with tracing.span("audio.preprocess", endpoint=endpoint):
+            converted = convert_wav(f, sample_rate, settings.AI_AUDIO_CHANNELS)
+    except Exception as e:
+        metrics.AUDIO_PREPROCESS_TOTAL.inc(endpoint=endpoint, outcome="failed")
+        logger.warning(f"음성 변환 실패, 원본 업로드: {file_path}, 에러: {e}")
+        f.seek(0)
+        return f
+
+    if converted is None:
+        metrics.AUDIO_PREPROCESS_TOTAL.inc(endpoint=endpoint, outcome="passthrough")
+        f.seek(0)
+        return f
+
+    original_size = f.seek(0, io.SEEK_END)
+    f.close()
+    metrics.AUDIO_PREPROCESS_TOTAL.inc(endpoint=endpoint, outcome="converted")
+    metrics.AUDIO_PREPROCESS_SECONDS.observe(time.monotonic() - started, endpoint=endpoint)
+    logger.info(f"음성 변환 완료: {file_path} ({original_size} -> {len(converted)} bytes)")
+    return io.BytesIO(converted)
@@ -0,0 +1,199 @@
+# ai-gateway/app/services/file_cleaner.py
+# 처리 완료된 음성 파일 지연/일괄 삭제 및 고아 파일 정리
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.file_service import run_io
+
+logger = logging.getLogger(__name__)
+
+
+class FileCleaner:
+    """
+    작업이 끝난 파일을 보관 시간이 지난 뒤 백그라운드에서 모아서 삭제하는 큐
+    - schedule(): 작업 경로에서는 큐에 넣기만 하므로 작업 완료 시간에 삭제 시간이 포함되지 않음
+    - 보관 시간(retention_sec) 동안은 파일을 남겨 두어 재전달된 작업도 파일을 찾을 수 있음
+    - 삭제 실패 시 지수 백오프로 max_attempts까지 재시도, 이후는 고아 파일 정리에 맡김
+    - 큐는 메모리에만 있으므로 stop() 시 보관 시간이 남은 파일도 바로 삭제 (재시작 시 유실 방지)
+    - orphan_dir에서 orphan_max_age_sec보다 오래된 파일은 주기적으로 삭제 (재시작/실패로 남은 파일)
+    (디스패처 이벤트 루프 위에서만 사용, 실제 unlink는 파일 I/O 스레드 풀에서 실행)
+    """
+
+    def __init__(
+        self,
+        retention_sec: float,
+        batch_size: int,
+        interval_sec: float,
+        max_attempts: int,
+        orphan_dir: Optional[str],
+        orphan_max_age_sec: float,
+        sweep_interval_sec: float,
+    ):
+        self.retention_sec = retention_sec
+        self.batch_size = batch_size
+        self.interval_sec = interval_sec
+        self.max_attempts = max_attempts
+        self.orphan_dir = orphan_dir
+        self.orphan_max_age_sec = orphan_max_age_sec
+        self.sweep_interval_sec = sweep_interval_sec
+        self._queue: list[tuple[float, int, str]] = []  # (삭제 예정 시각, 시도 횟수, 경로) 힙
+        self._pending: set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._next_sweep_at = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "FileCleaner":
+        return cls(
+            retention_sec=settings.FILE_RETENTION_SEC,
+            batch_size=settings.FILE_DELETE_BATCH_SIZE,
+            interval_sec=settings.FILE_DELETE_INTERVAL_SEC,
+            max_attempts=settings.FILE_DELETE_MAX_ATTEMPTS,
+            orphan_dir=settings.FILE_ORPHAN_DIR or None,
+            orphan_max_age_sec=settings.FILE_ORPHAN_MAX_AGE_HOURS * 3600,
+            sweep_interval_sec=settings.FILE_ORPHAN_SWEEP_INTERVAL_SEC,
+        )
+
+    def schedule(self, file_path: str):
+        """
+        보관 시간이 지난 뒤 삭제하도록 파일 등록 (이미 등록된 파일은 무시)
+        """
+        if file_path in self._pending:
+            return
+        self._pending.add(file_path)
+        heapq.heappush(self._queue, (time.monotonic() + self.retention_sec, 1, file_path))
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"파일 삭제 큐 시작: 보관 {self.retention_sec}s, 고아 파일 정리 {self.orphan_dir or '사용 안 함'}"
+            )
+
+    async def stop(self):
+        """
+        백그라운드 작업 중지 후 삭제 대기 중인 파일을 보관 시간과 관계없이 모두 삭제
+        (삭제 큐는 재시작 후 남지 않으므로, 여기서 지우지 않으면 고아 파일 정리를 켠 경우에만 정리됨)
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if not self._pending:
+            return
+        pending = list(self._pending)
+        logger.info(f"파일 삭제 큐 중지: 삭제 대기 파일 {len(pending)}개 즉시 삭제")
+        failures = await run_io(self._delete_batch, pending)
+        for file_path, error in failures.items():
+            metrics.FILE_DELETIONS_TOTAL.inc(outcome="failed")
+            logger.error(f"종료 시 파일 삭제 실패: {file_path}, 에러: {error}")
+        self._queue.clear()
+        self._pending.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                await self._flush()
+                if self.orphan_dir and time.monotonic() >= self._next_sweep_at:
+                    self._next_sweep_at = time.monotonic() + self.sweep_interval_sec
+                    await self._sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"파일 삭제 큐 처리 실패: {e}")
+            await asyncio.sleep(self.interval_sec)
+
+    async def _flush(self):
+        """
+        삭제 예정 시각이 지난 파일을 batch_size씩 삭제
+        """
+        while self._queue and self._queue[0][0] <= time.monotonic():
+            batch = []
+            while self._queue and self._queue[0][0] <= time.monotonic() and len(batch) < self.batch_size:
+                _, attempt, file_path = heapq.heappop(self._queue)
+                batch.append((attempt, file_path))
+
+            failures = await run_io(self._delete_batch, [file_path for _, file_path in batch])
+            for attempt, file_path in batch:
+                error = failures.get(file_path)
+                if error is None:
+                    self._pending.discard(file_path)
+                elif attempt >= self.max_attempts:
+                    self._pending.discard(file_path)
+                    metrics.FILE_DELETIONS_TOTAL.inc(outcome="failed")
+                    logger.error(f"파일 삭제 포기 ({attempt}회 실패): {file_path}, 에러: {error}")
+                else:
+                    metrics.FILE_DELETIONS_TOTAL.inc(outcome="retried")
+                    retry_at = time.monotonic() + self.interval_sec * (2 ** attempt)
+                    heapq.heappush(self._queue, (retry_at, attempt + 1, file_path))
+                    logger.warning(f"파일 삭제 실패, 재시도 예정 ({attempt}/{self.max_attempts}): {file_path}, 에러: {error}")
+
+    @staticmethod
+    def _delete_batch(file_paths: list[str]) -> dict[str, Exception]:
+        """
+        파일 목록 삭제 (파일 I/O 스레드에서 실행)
+
+        Returns:
+            실패한 파일 경로 -> 예외 (이미 없는 파일은 성공으로 처리)
+        """
+        failures = {}
+        deleted = 0
+        for file_path in file_paths:
+            try:
+                os.unlink(file_path)
+                deleted += 1
+                metrics.FILE_DELETIONS_TOTAL.inc(outcome="deleted")
+            except FileNotFoundError:
+                metrics.FILE_DELETIONS_TOTAL.inc(outcome="missing")
+            except Exception as e:
+                failures[file_path] = e
+        if deleted:
+            logger.info(f"파일 일괄 삭제 완료: {deleted}/{len(file_paths)}개")
+        return failures
+
+    async def _sweep(self):
+        removed = await run_io(self._sweep_orphans, set(self._pending))
+        if removed:
+            logger.info(f"고아 파일 정리 완료: {self.orphan_dir}, {removed}개 삭제")
+
+    def _sweep_orphans(self, pending: set[str]) -> int:
+        """
+        orphan_dir에서 오래된 파일 삭제 (파일 I/O 스레드에서 실행, 삭제 큐에 있는 파일은 제외)
+        """
+        expire_before = time.time() - self.orphan_max_age_sec
+        removed = 0
+        try:
+            entries = os.scandir(self.orphan_dir)
+        except FileNotFoundError:
+            return 0
+        with entries:
+            for entry in entries:
+                if entry.path in pending:
+                    continue
+                try:
+                    if not entry.is_file(follow_symlinks=False) or entry.stat().st_mtime >= expire_before:
+                        continue
+                    os.unlink(entry.path)
+                    removed += 1
+                    metrics.FILE_DELETIONS_TOTAL.inc(outcome="orphan")
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    logger.warning(f"고아 파일 삭제 실패: {entry.path}, 에러: {e}")
+        return removed
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "retention_sec": self.retention_sec}
+
+
+file_cleaner = FileCleaner.from_settings()
+metrics.FILES_PENDING_DELETION.set_function(lambda: {(): file_cleaner.pending_count})
@@ -1,19 +1,126 @@
 # ai-gateway/app/services/file_service.py
 # 공유 볼륨의 파일 처리 서비스
 
+import asyncio
+import contextvars
+import functools
+import hashlib
 import logging
+import os
+import stat
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Callable, Optional, TypeVar
+
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.services.wav import WavInfo, parse_wav_header
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# 파일 I/O 전용 스레드 풀 (NFS stat/open 지연이 이벤트 루프를 막지 않도록, 기본 executor와 분리)
+_io_executor: Optional[ThreadPoolExecutor] = None
+_io_executor_lock = threading.Lock()
+
+# 스레드별 재사용 읽기 버퍼 (해시 계산 시 청크마다 bytes를 새로 만들지 않음)
+_buffers = threading.local()
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    with _io_executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=settings.FILE_IO_THREADS, thread_name_prefix="file-io")
+        return _io_executor
+
+
+def shutdown_io_executor():
+    """
+    파일 I/O 스레드 풀 종료 (앱 종료 시 호출, 이후 호출되면 새로 생성)
+    """
+    global _io_executor
+    with _io_executor_lock:
+        executor, _io_executor = _io_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_io(func: Callable[..., T], *args) -> T:
+    """
+    블로킹 파일 I/O 함수를 파일 I/O 스레드 풀에서 실행 (트레이스 등 contextvar 유지)
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_io_executor(), functools.partial(context.run, func, *args))
+
+
+def submit_io(func: Callable[..., T], *args) -> "Future[T]":
+    """
+    블로킹 파일 I/O 함수를 파일 I/O 스레드 풀에 맡기고 바로 반환 (이벤트 루프 밖 콜백에서 사용)
+    """
+    context = contextvars.copy_context()
+    return _get_io_executor().submit(context.run, func, *args)
+
+
+def _read_buffer(size: int) -> memoryview:
+    buffer = getattr(_buffers, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        buffer = _buffers.buffer = bytearray(size)
+    return memoryview(buffer)[:size]
+
 class FileService:
     """
     공유 볼륨의 음성 파일을 처리하는 서비스
-    - 파일 읽기
-    - 파일 존재 확인
+    - 파일 읽기 / 스트리밍용 열기
+    - 파일 존재 확인 / WAV 헤더 검증
     - 파일 삭제
+    - *_async: 같은 작업을 파일 I/O 스레드 풀에서 실행 (이벤트 루프 위에서는 이쪽 사용)
     """
     
+    @staticmethod
+    def _resolve_path(file_path: str) -> Path:
+        path = Path(file_path)
+        if not path.is_absolute(): # 절대 경로가 아니면 /shared/audio 기준으로 처리
+            path = Path("/shared/audio") / path
+        return path
+
+    @staticmethod
+    def _open_regular(path: Path) -> tuple[BinaryIO, int]:
+        """
+        open 한 번 + fstat 한 번으로 열기와 검증을 함께 처리 (exists/is_file 별도 stat 없음)
+        
+        Returns:
+            (열린 바이너리 파일 객체, 파일 크기)
+        """
+        file_path = str(path)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            logger.error(f"파일을 찾을 수 없음: {file_path}")
+            raise FileNotFoundError(f"파일이 존재하지 않습니다: {file_path}")
+        except IsADirectoryError:
+            logger.error(f"파일이 아님: {file_path}")
+            raise IOError(f"유효한 파일이 아닙니다: {file_path}")
+        except Exception as e:
+            logger.error(f"파일 열기 실패: {file_path}, 에러: {e}")
+            raise IOError(f"파일 열기 실패: {e}")
+
+        try:
+            file_stat = os.fstat(f.fileno())
+        except Exception as e:
+            f.close()
+            logger.error(f"파일 열기 실패: {file_path}, 에러: {e}")
+            raise IOError(f"파일 열기 실패: {e}")
+        if not stat.S_ISREG(file_stat.st_mode):
+            f.close()
+            logger.error(f"파일이 아님: {file_path}")
+            raise IOError(f"유효한 파일이 아닙니다: {file_path}")
+        return f, file_stat.st_size
+
     @staticmethod
     def read_file(file_path: str) -> bytes:
         """
@@ -29,31 +136,113 @@ class FileService:
             FileNotFoundError: 파일이 존재하지 않을 때
             IOError: 파일 읽기 실패 시
         """
-        path = Path(file_path)
+        path = FileService._resolve_path(file_path)
+        file_path = str(path)
 
-        if not path.is_absolute(): # 절대 경로가 아니면 /shared/audio 기준으로 처리
-            path = Path("/shared/audio") / path
-            file_path = str(path)
-
-        if not path.exists():
-            logger.error(f"파일을 찾을 수 없음: {file_path}")
-            raise FileNotFoundError(f"파일이 존재하지 않습니다: {file_path}")
-        
-        if not path.is_file():
-            logger.error(f"파일이 아님: {file_path}")
-            raise IOError(f"유효한 파일이 아닙니다: {file_path}")
-        
+        f, _ = FileService._open_regular(path)
         try:
-            with open(path, 'rb') as f:
+            with f:
                 data = f.read()
             
-            file_size = len(data)
-            logger.info(f"파일 읽기 성공: {file_path} ({file_size} bytes)")
+            logger.info(f"파일 읽기 성공: {file_path} ({len(data)} bytes)")
             return data
         
         except Exception as e:
             logger.error(f"파일 읽기 실패: {file_path}, 에러: {e}")
             raise IOError(f"파일 읽기 실패: {e}")
+
+    @staticmethod
+    def open_file(file_path: str) -> BinaryIO:
+        """
+        파일을 바이너리 읽기 모드로 열어서 반환 (업로드 시 청크 단위 스트리밍용)
+        전체 내용을 메모리에 올리지 않으므로 호출자가 with 문으로 닫아야 함
+        
+        Args:
+            file_path: 열 파일의 경로 (예: /shared/audio/sample.wav)
+        
+        Returns:
+            열린 바이너리 파일 객체
+        
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 때
+            IOError: 파일 열기 실패 시
+        """
+        started = time.monotonic()
+        path = FileService._resolve_path(file_path)
+        file_path = str(path)
+
+        f, file_size = FileService._open_regular(path)
+
+        elapsed = time.monotonic() - started
+        metrics.FILE_OPEN_SECONDS.observe(elapsed)
+        trace = tracing.current_trace.get()
+        if trace is not None:
+            ended_ns = time.time_ns()
+            trace.add_span("file.open", ended_ns - int(elapsed * 1e9), ended_ns, bytes=file_size)
+        metrics.FILE_READ_BYTES.observe(file_size)
+        logger.info(f"파일 열기 성공: {file_path} ({file_size} bytes)")
+        return f
+    
+    @staticmethod
+    def probe_wav(file_path: str) -> WavInfo:
+        """
+        WAV 헤더만 읽어서 검증하고 형식/길이 정보 반환 (업로드 전에 잘못된 파일을 바로 걸러냄)
+        
+        Args:
+            file_path: 검사할 파일의 경로
+        
+        Returns:
+            WavInfo (채널 수, 샘플레이트, 비트 수, 데이터 크기, duration_sec)
+        
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 때
+            IOError: WAV 파일이 아니거나 헤더가 잘못되었거나 데이터가 잘린 경우
+        """
+        path = FileService._resolve_path(file_path)
+        file_path = str(path)
+
+        f, file_size = FileService._open_regular(path)
+        with f:
+            try:
+                info = parse_wav_header(f)
+            except ValueError as e:
+                logger.error(f"유효하지 않은 음성 파일: {file_path}, 에러: {e}")
+                raise IOError(f"유효하지 않은 음성 파일입니다: {e}")
+
+        available = file_size - info.data_offset
+        if info.data_size in (0, 0xFFFFFFFF):
+            # 스트리밍 녹음기가 크기를 채우지 않은 경우 파일 끝까지를 데이터로 간주
+            info.data_size = available
+        elif available < info.data_size:
+            logger.error(f"잘린 음성 파일: {file_path} (헤더 {info.data_size} bytes, 실제 {available} bytes)")
+            raise IOError(f"음성 데이터가 잘렸습니다: {info.data_size} bytes 중 {available} bytes")
+        if info.data_size < info.block_align:
+            logger.error(f"음성 데이터 없음: {file_path}")
+            raise IOError("음성 데이터가 없습니다")
+        return info
+
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+        """
+        파일 내용의 SHA-256 해시 (청크 단위로 읽어 전체를 메모리에 올리지 않음)
+        
+        Args:
+            file_path: 해시할 파일의 경로
+            chunk_size: 한 번에 읽을 바이트 수
+        
+        Returns:
+            16진수 해시 문자열
+        
+        Raises:
+            FileNotFoundError: 파일이 존재하지 않을 때
+        """
+        path = FileService._resolve_path(file_path)
+        digest = hashlib.sha256()
+        buffer = _read_buffer(chunk_size)
+        with open(path, 'rb') as f:
+            while n := f.readinto(buffer):
+                digest.update(buffer[:n])
+        return digest.hexdigest()
     
     @staticmethod
     def delete_file(file_path: str) -> bool:
@@ -68,15 +257,14 @@ class FileService:
         """
         path = Path(file_path)
         
-        if not path.exists():
-            logger.warning(f"삭제할 파일이 없음: {file_path}")
-            return False
-        
         try:
             path.unlink()
             logger.info(f"파일 삭제 완료: {file_path}")
             return True
         
+        except FileNotFoundError:
+            logger.warning(f"삭제할 파일이 없음: {file_path}")
+            return False
         except Exception as e:
             logger.error(f"파일 삭제 실패: {file_path}, 에러: {e}")
             return False
@@ -94,15 +282,41 @@ class FileService:
         """
         path = Path(file_path)
         
-        if not path.exists():
+        try:
+            file_stat = path.stat()
+        except FileNotFoundError:
             return {"exists": False, "path": file_path}
         
-        stat = path.stat()
         return {
             "exists": True,
             "path": str(path),
             "name": path.name,
-            "size": stat.st_size,
+            "size": file_stat.st_size,
             "extension": path.suffix,
-            "is_file": path.is_file()
+            "is_file": stat.S_ISREG(file_stat.st_mode)
         }
+
+    # 비동기 버전 (파일 I/O 스레드 풀에서 실행)
+    @staticmethod
+    async def read_file_async(file_path: str) -> bytes:
+        return await run_io(FileService.read_file, file_path)
+
+    @staticmethod
+    async def open_file_async(file_path: str) -> BinaryIO:
+        return await run_io(FileService.open_file, file_path)
+
+    @staticmethod
+    async def probe_wav_async(file_path: str) -> WavInfo:
+        return await run_io(FileService.probe_wav, file_path)
+
+    @staticmethod
+    async def hash_file_async(file_path: str) -> str:
+        return await run_io(FileService.hash_file, file_path)
+
+    @staticmethod
+    async def delete_file_async(file_path: str) -> bool:
+        return await run_io(FileService.delete_file, file_path)
+
+    @staticmethod
+    async def get_file_info_async(file_path: str) -> dict:
+        return await run_io(FileService.get_file_info, file_path)
@@ -0,0 +1,69 @@
+# ai-gateway/app/services/wav.py
+# WAV(RIFF) 헤더 파싱
+
+import io
+import struct
+from typing import BinaryIO
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavInfo:
+    """
+    WAV 헤더 정보 (fmt / data 청크)
+    """
+
+    __slots__ = ("audio_format", "channels", "sample_rate", "bits_per_sample", "block_align", "data_offset", "data_size")
+
+    def __init__(self, audio_format, channels, sample_rate, bits_per_sample, block_align, data_offset, data_size):
+        self.audio_format = audio_format
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.bits_per_sample = bits_per_sample
+        self.block_align = block_align
+        self.data_offset = data_offset
+        self.data_size = data_size
+
+    @property
+    def duration_sec(self) -> float:
+        return self.data_size / (self.block_align * self.sample_rate)
+
+
+def parse_wav_header(f: BinaryIO) -> WavInfo:
+    """
+    RIFF 청크를 따라가며 fmt / data 청크 위치 확인 (파일 위치는 data 시작으로 이동)
+
+    Raises:
+        ValueError: WAV 파일이 아니거나 헤더가 잘못된 경우
+    """
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("RIFF/WAVE 헤더가 아닙니다")
+
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            raise ValueError("data 청크가 없습니다")
+        chunk_id = chunk[:4]
+        chunk_size = struct.unpack("<I", chunk[4:])[0]
+
+        if chunk_id == b"fmt ":
+            body = f.read(chunk_size + (chunk_size & 1))
+            if chunk_size < 16 or len(body) < 16:
+                raise ValueError("fmt 청크가 너무 짧습니다")
+            audio_format, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            if audio_format == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                audio_format = struct.unpack("<H", body[24:26])[0]  # SubFormat GUID 앞 2바이트
+            fmt = (audio_format, channels, sample_rate, bits, block_align)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("fmt 청크가 data 청크보다 뒤에 있습니다")
+            audio_format, channels, sample_rate, bits, block_align = fmt
+            if not channels or not sample_rate or block_align != channels * ((bits + 7) // 8):
+                raise ValueError(f"잘못된 fmt 청크: channels={channels}, rate={sample_rate}, bits={bits}")
+            return WavInfo(audio_format, channels, sample_rate, bits, block_align, f.tell(), chunk_size)
+        else:
+            f.seek(chunk_size + (chunk_size & 1), io.SEEK_CUR)
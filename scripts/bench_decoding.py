@@ -0,0 +1,65 @@
+"""
+Benchmark job message decoding on a single thread.
+
+Run from the repository root: python -m scripts.bench_decoding
+"""
+
+import argparse
+import json
+import time
+from typing import Any
+
+from app.messaging.decoding import _JOB_ADAPTER, decode_job
+from app.messaging.schemas import AudioJobMessage
+
+
+def _decode_legacy(body: bytes) -> AudioJobMessage:
+    # The original consumer path: json.loads + model construction
+    message_dict = json.loads(body)
+    message_dict.get("taskId") or message_dict.get("task_id")
+    return AudioJobMessage(**message_dict)
+
+
+def _decode_validate_json(body: bytes) -> AudioJobMessage:
+    return _JOB_ADAPTER.validate_json(body)
+
+
+def _sample_body(words: int) -> bytes:
+    message: dict[str, Any] = {
+        "taskId": "req_550e8400-e29b-41d4-a716-446655440000",
+        "filePath": "/shared/audio/550e8400-e29b-41d4-a716-446655440000.wav",
+        "analysisRequest": {
+            "fullText": " ".join(["dance"] * words),
+            "wordDetails": [{"word": "dance", "index": i, "phonemes": ["D", "AE", "N", "S"]} for i in range(words)],
+        },
+    }
+    return json.dumps(message).encode("utf-8")
+
+
+def _bench(decode, body: bytes, count: int) -> float:
+    for _ in range(min(count, 1000)):
+        decode(body)
+    started = time.perf_counter()
+    for _ in range(count):
+        decode(body)
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000, help="messages decoded per run")
+    parser.add_argument("--words", type=int, nargs="+", default=[5, 50, 500, 2000], help="wordDetails sizes to test")
+    args = parser.parse_args()
+
+    candidates = [("legacy", _decode_legacy), ("validate_json", _decode_validate_json), ("decode_job", decode_job)]
+    print(f"{'words':>6} {'bytes':>8} " + " ".join(f"{name + ' msg/s':>19}" for name, _ in candidates))
+    for words in args.words:
+        body = _sample_body(words)
+        expected = _decode_legacy(body)
+        assert all(decode(body) == expected for _, decode in candidates)
+        rates = [_bench(decode, body, args.count) for _, decode in candidates]
+        print(f"{words:>6} {len(body):>8} " + " ".join(f"{rate:>19,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()